@@ -0,0 +1,55 @@
+"""
+Stateless JWT authentication for the REST API (JWT_STATELESS_AUTH=True)
+
+simplejwt's JWTAuthentication loads the User row on every request. This
+class trusts the signed claims of the access token instead, after checking
+its 'ver' claim against the user's current token version (see tokens.py),
+which is served from memory on the hot path: no queries to authenticate.
+Tokens without the claim (issued before it existed) take the regular path.
+"""
+
+from django.contrib.auth.models import AbstractBaseUser
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from .tokens import VERSION_CLAIM, current_version
+
+
+# TokenUser's save()/delete()/set_password()/check_password() raise
+#   NotImplementedError on purpose (no row behind it), pylint reads them as
+#   abstract
+class ClaimsUser(TokenUser):  # pylint: disable=abstract-method
+    """request.user built from the token claims (id, is_staff)"""
+
+    @cached_property
+    def id(self) -> int:
+        # the claim is a string; compare equal to the integer foreign keys
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self) -> int:
+        user_id: int = self.id
+        return user_id
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication without the per-request User lookup"""
+
+    def get_user(self, validated_token: Token) -> AbstractBaseUser | TokenUser:
+        version = validated_token.get(VERSION_CLAIM)
+        if version is None:
+            return super().get_user(validated_token)
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValueError) as exc:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            ) from exc
+        # a new password, staff flag or deactivation changes the version
+        if current_version(user_id) != version:
+            raise InvalidToken("Token is no longer valid for this user")
+        return ClaimsUser(validated_token)
@@ -0,0 +1,53 @@
+"""
+Authentication backend that hashes through accounts/hashing.py
+"""
+
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.core.exceptions import PermissionDenied
+from django.http import HttpRequest
+
+from . import hashing
+
+UserModel = get_user_model()
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ModelBackend with the password check in the hashing pool
+
+    Used by the login page and /api/token/. A hash made with an older hasher
+    or work factor (e.g. PBKDF2 after switching to Argon2) is replaced on the
+    next successful login. A failed check raises PermissionDenied, which ends
+    authenticate() here: ModelBackend, listed after this backend, would hash
+    the same password again, inline.
+    """
+
+    def authenticate(
+        self,
+        request: HttpRequest | None,
+        username: str | None = None,
+        password: str | None = None,
+        **kwargs: Any,
+    ) -> AbstractBaseUser | None:
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel.objects.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            hashing.make_password(password)
+            raise PermissionDenied from None
+
+        is_correct, must_update = hashing.verify_password(password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            raise PermissionDenied
+        if must_update:
+            user.password = hashing.make_password(password)
+            user.save(update_fields=["password"])
+        return user
@@ -0,0 +1,16 @@
+from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.models import User
+
+from .hashing import make_password
+
+
+# The registration form, hashing the password in the pool (see hashing.py);
+#   the ancestors are all UserCreationForm's
+class RegisterForm(UserCreationForm):  # pylint: disable=too-many-ancestors
+    def set_password_and_save(
+        self, user: User, password_field_name: str = "password1", commit: bool = True
+    ) -> User:
+        user.password = make_password(self.cleaned_data[password_field_name])
+        if commit:
+            user.save()
+        return user
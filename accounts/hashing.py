@@ -0,0 +1,113 @@
+"""
+Password hashing off the request worker
+
+PBKDF2 and Argon2 are slow on purpose, and a burst of signups or logins run
+inline keeps every worker busy hashing (until even /healthz/ times out). With
+PASSWORD_HASH_WORKERS > 0, make_password() and verify_password() run in a
+process pool of that many workers, created on first use in each server
+process. At most PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE jobs may be in
+flight; beyond that PoolSaturated is raised, which PoolSaturatedMiddleware
+turns into a 503 with Retry-After instead of letting requests pile up.
+
+With PASSWORD_HASH_WORKERS=0 (the default) hashing runs inline as before.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PoolSaturated(Exception):
+    """The hashing pool has no room for another job: answer 503"""
+
+
+def _init_worker() -> None:
+    # Spawned workers start from scratch: load the settings (hashers, salt)
+    # pylint: disable=import-outside-toplevel
+    import django
+
+    django.setup()
+
+
+def new_pool(workers: int) -> ProcessPoolExecutor:
+    """A process pool whose workers can run Django's hashers"""
+    # spawn, not fork: the server process may be running threads
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+
+
+_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+_slots: threading.BoundedSemaphore | None = None
+_config: tuple[int, int] | None = None
+
+
+def get_pool() -> tuple[ProcessPoolExecutor, threading.BoundedSemaphore]:
+    """This process's pool and its job slots, (re)created for the settings"""
+    global _pool, _slots, _config  # pylint: disable=global-statement
+    config = (settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE)
+    with _lock:
+        if _pool is None or _slots is None or _config != config:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            workers, queue = config
+            _pool = new_pool(workers)
+            _slots = threading.BoundedSemaphore(workers + queue)
+            _config = config
+        return _pool, _slots
+
+
+def reset_pool() -> None:
+    """Drop the pool (a new one starts on the next job)"""
+    global _pool  # pylint: disable=global-statement
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _run(function: Callable, *args: Any) -> Any:
+    """Run function(*args) in the pool, or inline when the pool is disabled"""
+    if not settings.PASSWORD_HASH_WORKERS:
+        return function(*args)
+    pool, slots = get_pool()
+    # released by the job's done callback below, not on leaving a block
+    if not slots.acquire(blocking=False):  # pylint: disable=consider-using-with
+        raise PoolSaturated
+    try:
+        future: Future = pool.submit(function, *args)
+    except BrokenProcessPool as exc:
+        # a worker died (e.g. killed for memory): start a new pool next time
+        slots.release()
+        reset_pool()
+        raise PoolSaturated from exc
+    # the slot is held until the job is done, even if we stop waiting for it
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT)
+    except FutureTimeout as exc:
+        raise PoolSaturated from exc
+    except BrokenProcessPool as exc:
+        reset_pool()
+        raise PoolSaturated from exc
+
+
+def make_password(password: str) -> str:
+    """hashers.make_password() with the preferred hasher, in the pool"""
+    encoded: str = _run(hashers.make_password, password)
+    return encoded
+
+
+def verify_password(password: str | None, encoded: str) -> tuple[bool, bool]:
+    """hashers.verify_password() in the pool: (is_correct, must_update)"""
+    result: tuple[bool, bool] = _run(hashers.verify_password, password, encoded)
+    return result
@@ -0,0 +1,107 @@
+# pylint: disable=W0613
+#
+# Password checks (logins) per second, inline and through the hashing pool
+#   <project_root>$ python manage.py bench_hashing
+#   <project_root>$ python manage.py bench_hashing --seconds 5 --workers 4 \
+#       --output hashing.json
+#
+# "inline" is what a request worker did before accounts/hashing.py: one
+#   login at a time on one core. "pool" keeps --workers processes busy.
+#
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils.module_loading import import_string
+
+from accounts.hashing import new_pool
+from config.reports import write_report
+
+HASHERS = {
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",
+}
+PASSWORD = "correct horse battery staple"
+
+
+def check(hasher_path: str, encoded: str) -> bool:
+    """One login's worth of hashing (runs in the pool)"""
+    return bool(import_string(hasher_path)().verify(PASSWORD, encoded))
+
+
+class Command(BaseCommand):
+    help = "Benchmark password checks per second (per core), inline vs pooled"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--seconds", type=float, default=3, help="Duration of each run"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Pool processes (default: one per core)",
+        )
+        parser.add_argument("--output", help="Also write the JSON report here")
+
+    def handle(self, *args: str, **options: Any) -> None:
+        seconds, workers = options["seconds"], options["workers"]
+        report: dict[str, Any] = {
+            "cpu_count": os.cpu_count(),
+            "workers": workers,
+            "hashers": {},
+        }
+        pool = new_pool(workers)
+        try:
+            for name, path in HASHERS.items():
+                try:
+                    hasher = import_string(path)()
+                    encoded = hasher.encode(PASSWORD, hasher.salt())
+                except ValueError as exc:  # library not installed
+                    self.stderr.write(f"{name}: skipped ({exc})")
+                    continue
+                self.stderr.write(f"{name}: inline")
+                inline = self.run_inline(path, encoded, seconds)
+                self.stderr.write(f"{name}: pool of {workers}")
+                pooled = self.run_pool(pool, path, encoded, seconds, workers)
+                cores = min(workers, os.cpu_count() or 1)
+                report["hashers"][name] = {
+                    "inline_logins_per_sec": round(inline, 1),
+                    "pool_logins_per_sec": round(pooled, 1),
+                    "pool_logins_per_sec_per_core": round(pooled / cores, 1),
+                }
+        finally:
+            pool.shutdown()
+
+        write_report(self, report, options["output"])
+
+    @staticmethod
+    def run_inline(path: str, encoded: str, seconds: float) -> float:
+        done = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            check(path, encoded)
+            done += 1
+        return done / (time.perf_counter() - start)
+
+    @staticmethod
+    def run_pool(
+        pool: Any, path: str, encoded: str, seconds: float, workers: int
+    ) -> float:
+        # warm up: start every worker process before timing
+        for future in [pool.submit(check, path, encoded) for _ in range(workers)]:
+            future.result()
+        done = 0
+        start = time.perf_counter()
+        # keep two jobs per worker queued
+        pending = {pool.submit(check, path, encoded) for _ in range(workers * 2)}
+        while time.perf_counter() - start < seconds:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            done += len(finished)
+            pending |= {pool.submit(check, path, encoded) for _ in finished}
+        wait(pending)
+        done += len(pending)
+        return done / (time.perf_counter() - start)
@@ -0,0 +1,49 @@
+# pylint: disable=W0613
+#
+# Delete expired sessions in small batches
+#   <project_root>$ python manage.py prune_sessions
+#   <project_root>$ python manage.py prune_sessions --batch-size 1000 --pause 0.1
+#
+# Django's clearsessions removes every expired row in one DELETE, which on a
+#   large django_session table holds its locks (and the WAL) for a long time.
+#   This deletes --batch-size rows per statement, each in its own transaction,
+#   optionally pausing in between. Only the db and cached_db session backends
+#   keep rows (signed_cookies and cache expire on their own).
+#
+
+import time
+from typing import Any
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Delete expired database sessions in batches"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size", type=int, default=5000, help="Rows per DELETE"
+        )
+        parser.add_argument(
+            "--pause", type=float, default=0.0, help="Seconds between batches"
+        )
+
+    def handle(self, *args: str, **options: Any) -> None:
+        # sessions expiring while this runs are left for the next run
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now)
+        deleted = 0
+        while True:
+            keys = list(
+                expired.values_list("session_key", flat=True)[: options["batch_size"]]
+            )
+            if not keys:
+                break
+            count, _ = Session.objects.filter(session_key__in=keys).delete()
+            deleted += count
+            self.stderr.write(f"sessions: {deleted:,}")
+            if options["pause"]:
+                time.sleep(options["pause"])
+        self.stdout.write(f"Deleted {deleted:,} expired sessions.")
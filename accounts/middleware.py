@@ -0,0 +1,65 @@
+"""
+Accounts middleware
+"""
+
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser, User
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from .hashing import PoolSaturated
+from .usercache import load_user
+
+# Seconds a client is asked to wait when the hashing pool is full
+RETRY_AFTER = 5
+
+
+def retry_later(
+    request: HttpRequest, status: int, message: str, retry_after: int
+) -> HttpResponse:
+    """A 429/503 with Retry-After: JSON for the API, plain text otherwise"""
+    if "/api/" in request.path:
+        response = JsonResponse({"detail": message}, status=status)
+    else:
+        response = HttpResponse(message, status=status, content_type="text/plain")
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+class PoolSaturatedMiddleware(MiddlewareMixin):
+    """Answer 503 + Retry-After when the password hashing pool is full"""
+
+    def process_exception(
+        self, request: HttpRequest, exception: Exception
+    ) -> HttpResponse | None:
+        if not isinstance(exception, PoolSaturated):
+            return None
+        return retry_later(
+            request, 503, "The server is busy, please retry shortly.", RETRY_AFTER
+        )
+
+
+def _get_user(request: HttpRequest) -> User | AnonymousUser:
+    if not hasattr(request, "cached_user"):
+        request.cached_user = load_user(request)
+    return request.cached_user
+
+
+async def _aget_user(request: HttpRequest) -> User | AnonymousUser:
+    if not hasattr(request, "acached_user"):
+        request.acached_user = await sync_to_async(load_user)(request)
+    return request.acached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware loading request.user through usercache.py"""
+
+    def process_request(self, request: HttpRequest) -> None:
+        # the session middleware check, and the stock request.user/auser
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: _get_user(request))
+        request.auser = partial(_aget_user, request)
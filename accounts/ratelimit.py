@@ -0,0 +1,123 @@
+"""
+Token-bucket rate limiting for the authentication endpoints
+
+Each (scope, key) pair, e.g. ("login", client IP) or ("login", username),
+has a bucket of N tokens refilled at N per period (settings.RATELIMITS,
+rates written "N/s", "N/m" or "N/h"). A request takes one token from each of
+its buckets; with one empty it is answered 429 with Retry-After, before any
+password is hashed.
+
+Buckets live in the Django cache (local memory by default, so per process;
+share them between processes with a Redis CACHE_BACKEND). Updates are
+atomic within a process; across processes a burst may slip a few extra
+requests through, which is fine for admission control.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+
+from .middleware import retry_later
+
+PERIODS = {"s": 1, "m": 60, "h": 3600}
+
+_lock = threading.Lock()
+_rejected: Counter[tuple[str, str]] = Counter()
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """'10/m' -> (10 requests, 60 seconds)"""
+    count, period = rate.split("/")
+    return int(count), PERIODS[period]
+
+
+def ratelimit_stats() -> dict[tuple[str, str], int]:
+    """Rejected requests by (scope, key kind) in this process"""
+    with _lock:
+        return dict(_rejected)
+
+
+def client_ip(request: HttpRequest) -> str:
+    """
+    The client address, taken from X-Forwarded-For when the app runs behind
+    RATELIMIT_PROXY_COUNT trusted proxies (each appends the address it saw)
+    """
+    proxies: int = settings.RATELIMIT_PROXY_COUNT
+    if proxies:
+        forwarded: list[str] = request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies].strip()
+    remote_addr: str = request.META.get("REMOTE_ADDR", "")
+    return remote_addr
+
+
+def _username(request: HttpRequest) -> str:
+    """The username a login is for (form or JSON body), '' if none"""
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return ""
+        username = data.get("username") if isinstance(data, dict) else None
+    else:
+        username = request.POST.get("username")
+    return str(username or "")[:150]
+
+
+def take(scope: str, kind: str, key: str, rate: str) -> float:
+    """
+    Take a token from a bucket
+
+    Returns:
+        float: 0 if the request may go ahead, else seconds until it may
+    """
+    capacity, period = parse_rate(rate)
+    refill = capacity / period
+    cache_key = f"ratelimit:{scope}:{kind}:{key}"
+    now = time.time()
+    with _lock:
+        tokens, updated = cache.get(cache_key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # a bucket left alone for a period is full again: let it expire
+        cache.set(cache_key, (tokens, now), timeout=period)
+        if allowed:
+            return 0.0
+        _rejected[(scope, kind)] += 1
+    return (1 - tokens) / refill
+
+
+def ratelimit(scope: str, methods: tuple[str, ...] = ("POST",)) -> Callable:
+    """View decorator applying the settings.RATELIMITS[scope] buckets"""
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapped(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            if settings.RATELIMIT_ENABLED and request.method in methods:
+                for kind, rate in settings.RATELIMITS[scope].items():
+                    key = client_ip(request) if kind == "ip" else _username(request)
+                    if not key:
+                        continue
+                    wait = take(scope, kind, key, rate)
+                    if wait:
+                        return retry_later(
+                            request,
+                            429,
+                            "Too many requests, please retry later.",
+                            math.ceil(wait),
+                        )
+            return view(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
@@ -0,0 +1,29 @@
+"""
+Model signal receivers for the accounts app (connected in AccountsConfig.ready)
+"""
+
+from functools import partial
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .tokens import forget_user
+from .usercache import forget_cached_user
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(instance: User, **kwargs: Any) -> None:
+    """
+    A user was saved or deleted: re-read its token version (tokens.py) and
+    its cached session User (usercache.py)
+    """
+    # a login only touches last_login, which neither of them depends on
+    if kwargs.get("update_fields") == frozenset({"last_login"}):
+        return
+    for forget in (forget_user, forget_cached_user):
+        forget(instance.pk)
+        # and again once committed, in case a request re-cached the old row
+        transaction.on_commit(partial(forget, instance.pk))
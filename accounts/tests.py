@@ -1,4 +1,239 @@
-# pylint: disable=W0611 # Unused TestCase imported
-from django.test import TestCase
+import importlib.util
+import io
+import unittest
+from typing import Any
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from . import hashing
+from .authentication import StatelessJWTAuthentication
+from .ratelimit import ratelimit_stats
+from .tokens import VERSION_CLAIM, VersionedRefreshToken, _versions
+
+
+@override_settings(JWT_USER_VERSION_TTL=60)
+class StatelessJWTAuthenticationTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        _versions.clear()
+        self.user = User.objects.create_user(username="api", password="pw")
+        self.auth = StatelessJWTAuthentication()
+
+    def authenticate(self, token: AccessToken) -> Any:
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        result = self.auth.authenticate(request)
+        assert result is not None
+        return result[0]
+
+    def test_obtain_pair_has_claims(self) -> None:
+        response = self.client.post(
+            reverse("token_obtain_pair"), {"username": "api", "password": "pw"}
+        )
+        access = AccessToken(response.json()["access"])
+        self.assertIn(VERSION_CLAIM, access)
+        self.assertFalse(access["is_staff"])
+
+    def test_no_queries_once_cached(self) -> None:
+        token = VersionedRefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(1):
+            self.authenticate(token)
+        with self.assertNumQueries(0):
+            user = self.authenticate(token)
+        # compares equal to integer foreign keys
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_password_change_and_promotion_revoke(self) -> None:
+        for change in ("password", "staff"):
+            with self.subTest(change=change):
+                token = VersionedRefreshToken.for_user(self.user).access_token
+                self.authenticate(token)
+                if change == "password":
+                    self.user.set_password("new")
+                else:
+                    self.user.is_staff = True
+                self.user.save()
+                with self.assertRaises(InvalidToken):
+                    self.authenticate(token)
+                fresh = VersionedRefreshToken.for_user(self.user).access_token
+                self.assertEqual(self.authenticate(fresh).is_staff, self.user.is_staff)
+
+    def test_unversioned_token_loads_the_user(self) -> None:
+        token = RefreshToken.for_user(self.user).access_token
+        self.assertEqual(self.authenticate(token), self.user)
+
+
+HAS_ARGON2 = importlib.util.find_spec("argon2") is not None
+
+
+class PasswordHashingTest(TestCase):
+    def setUp(self) -> None:
+        # no rate limit buckets left over from other tests
+        cache.clear()
+
+    def tearDown(self) -> None:
+        hashing.reset_pool()
+
+    def login(self, password: str = "pw") -> Any:
+        return self.client.post(
+            reverse("token_obtain_pair"), {"username": "hasher", "password": password}
+        )
+
+    @override_settings(PASSWORD_HASH_WORKERS=1)
+    def test_register_and_login_through_the_pool(self) -> None:
+        response = self.client.post(
+            reverse("accounts:api-register"),
+            {"username": "hasher", "password1": "pw", "password2": "pw"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login("wrong").status_code, 401)
+
+    @override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=0)
+    def test_saturated_pool_answers_503(self) -> None:
+        User.objects.create_user(username="hasher", password="pw")
+        _, slots = hashing.get_pool()
+        with slots:
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+    @unittest.skipUnless(HAS_ARGON2, "argon2-cffi is not installed")
+    def test_login_upgrades_to_argon2(self) -> None:
+        user = User.objects.create_user(username="hasher", password="pw")
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+        with self.settings(
+            PASSWORD_HASHERS=[
+                "django.contrib.auth.hashers.Argon2PasswordHasher",
+                "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            ]
+        ):
+            self.assertEqual(self.login().status_code, 200)
+            user.refresh_from_db()
+            self.assertTrue(user.password.startswith("argon2$"))
+            self.assertEqual(self.login().status_code, 200)
+
+    def test_wrong_password_is_hashed_once(self) -> None:
+        User.objects.create_user(username="hasher", password="pw")
+        with mock.patch(
+            "accounts.hashing.hashers.verify_password",
+            wraps=hashing.hashers.verify_password,
+        ) as verify:
+            self.assertEqual(self.login("wrong").status_code, 401)
+        # not again by ModelBackend, listed after the pooled backend
+        self.assertEqual(verify.call_count, 1)
+
+    def test_model_backend_sessions_stay_logged_in(self) -> None:
+        user = User.objects.create_user(username="hasher", password="pw")
+        self.client.force_login(user, "django.contrib.auth.backends.ModelBackend")
+        response = self.client.get(reverse("notes:topics"))
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    RATELIMITS={
+        "login": {"ip": "5/m", "username": "2/m"},
+        "register": {"ip": "1/m"},
+        "refresh": {"ip": "1/m"},
+    },
+)
+class RateLimitTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def login(self, username: str, **extra: Any) -> Any:
+        return self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": username, "password": "pw"},
+            **extra,
+        )
+
+    def test_per_username_and_per_ip(self) -> None:
+        before = ratelimit_stats().get(("login", "username"), 0)
+        self.assertEqual(self.login("alice").status_code, 401)
+        self.assertEqual(self.login("alice").status_code, 401)
+        response = self.login("alice")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertEqual(ratelimit_stats()[("login", "username")], before + 1)
+        # other usernames until the IP bucket runs out too
+        self.assertEqual(self.login("bob").status_code, 401)
+        self.assertEqual(self.login("carol").status_code, 401)
+        self.assertEqual(self.login("dave").status_code, 429)
+
+    @override_settings(RATELIMIT_PROXY_COUNT=1)
+    def test_forwarded_client_ip(self) -> None:
+        def register(forwarded_for: str) -> Any:
+            return self.client.post(
+                reverse("accounts:api-register"),
+                {},
+                content_type="application/json",
+                HTTP_X_FORWARDED_FOR=forwarded_for,
+            )
+
+        # the proxy appends the address it saw; earlier entries are spoofable
+        self.assertEqual(register("1.1.1.1, 10.0.0.1").status_code, 400)
+        response = register("2.2.2.2, 10.0.0.1")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("detail", response.json())
+        self.assertEqual(register("10.0.0.2").status_code, 400)
+
+    def test_login_page_get_is_not_limited(self) -> None:
+        for _ in range(3):
+            response = self.client.get(reverse("accounts:login"))
+            self.assertEqual(response.status_code, 200)
+
+
+class SessionFastPathTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username="fast", password="pw")
+        self.client.force_login(self.user)
+        self.url = reverse("notes:index")
+
+    def test_user_query_skipped_once_cached(self) -> None:
+        self.client.get(self.url)
+        # the session only
+        with self.assertNumQueries(1):
+            self.assertContains(self.client.get(self.url), "fast")
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.cached_db")
+    def test_no_queries_with_cached_sessions(self) -> None:
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(self.url), "fast")
+
+    def test_password_change_ends_other_sessions(self) -> None:
+        self.client.get(self.url)
+        self.user.set_password("new")
+        self.user.save()
+        response = self.client.get(reverse("notes:topics"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_promote_to_admin_seen_at_once(self) -> None:
+        admin_url = reverse("admin:index")
+        self.assertEqual(self.client.get(admin_url).status_code, 302)
+        call_command("promote_to_admin", "fast", stdout=io.StringIO())
+        self.assertEqual(self.client.get(admin_url).status_code, 200)
+
+    def test_prune_sessions(self) -> None:
+        Session.objects.create(
+            session_key="old", session_data="", expire_date=timezone.now()
+        )
+        out = io.StringIO()
+        call_command("prune_sessions", batch_size=1, stdout=out, stderr=io.StringIO())
+        self.assertIn("Deleted 1 expired", out.getvalue())
+        # the logged in session is kept
+        self.assertEqual(self.client.get(reverse("notes:topics")).status_code, 200)
@@ -0,0 +1,133 @@
+"""
+Versioned JWT claims for the stateless API auth (see authentication.py)
+
+Tokens issued by /api/token/ and /accounts/api/register/ carry two extra
+claims besides the user id:
+
+    is_staff: the user's staff flag when the token was issued
+    ver:      a short HMAC of the user's password hash, staff and active flags
+
+Any change to those fields (a password change, promote_to_admin,
+deactivation) gives the user a new version, so older tokens stop matching.
+The current version of each user is kept in a small in-process LRU in front
+of the Django cache, both expiring after JWT_USER_VERSION_TTL seconds; User
+saves drop the entry straight away (see signals.py).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Self, cast
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.crypto import salted_hmac
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+STAFF_CLAIM = "is_staff"
+VERSION_CLAIM = "ver"
+
+# Most users kept in the in-process LRU
+LRU_SIZE = 10_000
+
+
+def token_version(password: str, is_staff: bool, is_active: bool) -> str:
+    """The version claim for a user's current credentials and flags"""
+    value = f"{password}|{int(is_staff)}|{int(is_active)}"
+    digest: str = salted_hmac("accounts.tokens.version", value).hexdigest()
+    return digest[:16]
+
+
+class VersionedRefreshToken(RefreshToken):
+    """A refresh token (and its access tokens) with the is_staff/ver claims"""
+
+    @classmethod
+    def for_user(cls, user: User) -> Self:
+        # RefreshToken.for_user() builds a cls(), typed as the base class
+        token = cast(Self, super().for_user(user))
+        token[STAFF_CLAIM] = user.is_staff
+        token[VERSION_CLAIM] = token_version(
+            user.password, user.is_staff, user.is_active
+        )
+        return token
+
+
+# validates credentials into tokens, never saves: no create()/update()
+class VersionedTokenObtainPairSerializer(  # pylint: disable=abstract-method
+    TokenObtainPairSerializer
+):
+    """/api/token/ serializer issuing VersionedRefreshToken pairs"""
+
+    token_class = VersionedRefreshToken
+
+
+class _VersionLRU:
+    """Thread-safe LRU of user id -> (version or None, expiry time)"""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._lock = threading.Lock()
+        self._items: OrderedDict[int, tuple[str | None, float]] = OrderedDict()
+
+    def get(self, user_id: int) -> tuple[bool, str | None]:
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None or item[1] < time.monotonic():
+                return False, None
+            self._items.move_to_end(user_id)
+            return True, item[0]
+
+    def set(self, user_id: int, version: str | None, ttl: float) -> None:
+        with self._lock:
+            self._items[user_id] = (version, time.monotonic() + ttl)
+            self._items.move_to_end(user_id)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def pop(self, user_id: int) -> None:
+        with self._lock:
+            self._items.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+_versions = _VersionLRU(LRU_SIZE)
+
+
+def _cache_key(user_id: int) -> str:
+    return f"accounts:token-version:{user_id}"
+
+
+def current_version(user_id: int) -> str | None:
+    """
+    The user's token version, None if the user no longer exists
+
+    Served from the in-process LRU, then the Django cache, then the database.
+    """
+    found, version = _versions.get(user_id)
+    if found:
+        return version
+
+    ttl = settings.JWT_USER_VERSION_TTL
+    # "" marks a missing user in the cache (None means not cached)
+    version = cache.get(_cache_key(user_id))
+    if version is None:
+        row = (
+            User.objects.filter(pk=user_id)
+            .values_list("password", "is_staff", "is_active")
+            .first()
+        )
+        version = token_version(*row) if row else ""
+        cache.set(_cache_key(user_id), version, timeout=ttl)
+    _versions.set(user_id, version or None, ttl)
+    return version or None
+
+
+def forget_user(user_id: int) -> None:
+    """Drop the cached version so the next request reads the user again"""
+    _versions.pop(user_id)
+    cache.delete(_cache_key(user_id))
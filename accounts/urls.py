@@ -2,10 +2,12 @@
 URL configuration for the accounts app (login page).
 """
 
+from django.contrib.auth import views as auth_views
 from django.urls import path, include
 
 # Bring in the locally defined views
 from . import views
+from .ratelimit import ratelimit
 
 # Unique name helps Django to identify this specific urls.py
 app_name = "accounts"
@@ -15,6 +17,8 @@ urlpatterns = [
     # Login page
     # Add "" to the route to match the default (root url) path "/"
     # django urls provide 'accounts/login' and 'accounts/logout' urls
+    # (the login view is listed first to add the rate limit)
+    path("login/", ratelimit("login")(auth_views.LoginView.as_view()), name="login"),
     path("", include("django.contrib.auth.urls")),
     # Any additional pages available for this app...
     # User Registration
@@ -0,0 +1,61 @@
+"""
+Cached user loading for session-authenticated requests
+
+Django's AuthenticationMiddleware reads the user row on every request. With
+AUTH_USER_CACHE=True, CachedAuthenticationMiddleware (middleware.py) keeps the
+User in the Django cache for AUTH_USER_CACHE_TTL seconds instead. A cached
+user is only used when the session's auth hash still matches it, so a
+password change logs out other sessions as before; anything unusual (no
+cached copy, a hash mismatch, a rotated SECRET_KEY) goes through Django's own
+get_user() and its checks. User saves drop the cached copy (see signals.py).
+
+With the local memory cache (per process) another server process may go on
+using its copy for up to AUTH_USER_CACHE_TTL seconds after a change, as with
+the token versions in tokens.py.
+"""
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.utils.crypto import constant_time_compare
+
+
+def _cache_key(user_id: int | str) -> str:
+    return f"accounts:session-user:{user_id}"
+
+
+def _session_matches(request: HttpRequest, user: User) -> bool:
+    """The checks get_user() makes against the loaded row, on the cached one"""
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    return (
+        request.session.get(auth.BACKEND_SESSION_KEY)
+        in settings.AUTHENTICATION_BACKENDS
+        and user.is_active
+        and bool(session_hash)
+        and constant_time_compare(session_hash, user.get_session_auth_hash())
+    )
+
+
+def load_user(request: HttpRequest) -> User | AnonymousUser:
+    """The session's user, from the cache when possible"""
+    if not settings.AUTH_USER_CACHE:
+        return auth.get_user(request)
+    user_id = request.session.get(auth.SESSION_KEY)
+    if user_id is None:
+        return AnonymousUser()
+
+    user = cache.get(_cache_key(user_id))
+    if user is not None and _session_matches(request, user):
+        return user
+    # the full checks (which may also flush or re-key the session)
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(_cache_key(user.pk), user, timeout=settings.AUTH_USER_CACHE_TTL)
+    return user
+
+
+def forget_cached_user(user_id: int) -> None:
+    """Drop the cached User so the next request reads the row again"""
+    cache.delete(_cache_key(user_id))
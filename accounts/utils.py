@@ -1,6 +1,8 @@
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 
+from .hashing import make_password
+
 
 def register_user(username: str, password1: str, password2: str) -> User:
     """
@@ -14,6 +16,7 @@ def register_user(username: str, password1: str, password2: str) -> User:
     Raises:
         ValidationError: missing input, password mismatch,
                          or username in exists
+        PoolSaturated: too many passwords are being hashed (see hashing.py)
 
     Returns:
         User: The newly created usewr instance
@@ -25,4 +28,8 @@ def register_user(username: str, password1: str, password2: str) -> User:
     if User.objects.filter(username=username).exists():
         raise ValidationError("Username already exists.")
 
-    return User.objects.create_user(username=username, password=password1)
+    # create_user() would hash inline; use the pool (see hashing.py)
+    return User.objects.create(
+        username=User.normalize_username(username),
+        password=make_password(password1),
+    )
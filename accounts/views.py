@@ -2,24 +2,26 @@ import json
 
 from django.shortcuts import render, redirect
 from django.contrib.auth import login
-from django.contrib.auth.forms import UserCreationForm
 from django.http import HttpRequest, HttpResponse
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.core.exceptions import ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from .forms import RegisterForm
+from .ratelimit import ratelimit
+from .tokens import VersionedRefreshToken
 from .utils import register_user
 
 
+@ratelimit("register")
 def register(request: HttpRequest) -> HttpResponse:
     """New User registration"""
     if request.method != "POST":
         # Present the blank form to the user
-        form = UserCreationForm()
+        form = RegisterForm()
     else:
         # Recieved contents of form
-        form = UserCreationForm(data=request.POST)
+        form = RegisterForm(data=request.POST)
 
         if form.is_valid():
             # Save the user and encrypted password to the database
@@ -36,6 +38,7 @@ def register(request: HttpRequest) -> HttpResponse:
 
 
 @csrf_exempt  # not using session-based auth
+@ratelimit("register")
 def api_register(request: HttpRequest) -> JsonResponse:
     """
     REST API user registration
@@ -61,8 +64,8 @@ def api_register(request: HttpRequest) -> JsonResponse:
     except ValidationError as ve:
         return JsonResponse({"error": str(ve)}, status=400)
 
-    # Create token
-    refresh = RefreshToken.for_user(user)
+    # Create token (with the claims the stateless API auth checks)
+    refresh = VersionedRefreshToken.for_user(user)
 
     # Return the registered user and their access token
     return JsonResponse(
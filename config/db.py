@@ -0,0 +1,57 @@
+"""
+Database connection acquisition stats
+
+config.postgresql (the PostgreSQL backend used in production, see settings)
+times every connection it hands to Django: a fresh connect without the pool,
+or the wait for a free connection with DB_POOL=True. Both are reported on
+/metrics/ along with the psycopg_pool counters, so a pool that is too small
+(requests queueing for a connection) shows up before it starts timing out.
+"""
+
+import threading
+from bisect import bisect_left
+
+from django.db import connections
+
+# Histogram bucket upper bounds (seconds): acquiring should take well under 1ms
+#   from a pool, a few ms to connect
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class AcquireStats:
+    """Thread-safe histogram of connection acquisition times"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.buckets[bisect_left(BUCKETS, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            # one slot per bucket plus +Inf
+            self.buckets = [0] * (len(BUCKETS) + 1)
+            self.count = 0
+            self.total = 0.0
+
+    def snapshot(self) -> tuple[list[int], int, float]:
+        with self._lock:
+            return list(self.buckets), self.count, self.total
+
+
+acquire_stats = AcquireStats()
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """psycopg_pool counters (get_stats()) per database alias using a pool"""
+    stats = {}
+    for alias in connections:
+        # only the PostgreSQL backend has a pool, and only with DB_POOL=True
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
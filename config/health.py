@@ -0,0 +1,156 @@
+# pylint: disable=unused-argument
+
+"""
+Liveness and readiness probes
+
+    /healthz/live   the process is up and answering: no dependencies touched,
+                    so a database outage doesn't get every worker restarted
+    /healthz/ready  this worker can serve requests: its database connection
+                    works, no migration is waiting to be applied and the cache
+                    answers. 503 when a check fails, so the platform stops
+                    routing traffic here until it recovers
+
+Both answer with JSON; the readiness body has each check's result and latency:
+
+    {"status": "ok", "age": 1.2, "checks": {"database": {"ok": true,
+     "ms": 0.4}, "migrations": {...}, "cache": {...}}}
+
+The readiness result is memoized per process for HEALTH_CHECK_TTL seconds
+(default 5, "age" is how old it is), so however often the probes come, the
+dependencies see at most one round of checks per worker per TTL. Concurrent
+probes wait for the round in progress instead of starting their own. Once the
+migrations are found applied they aren't checked again: only a deploy (a new
+process) brings new ones. /healthz/ stays a liveness alias for existing
+monitors.
+"""
+
+import threading
+import time
+import uuid
+from typing import Any, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest, JsonResponse
+
+from config.schema import unapplied_migrations
+
+
+def check_database() -> str | None:
+    """A round trip on this worker's connection (reconnecting if it is dead)"""
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute("SELECT 1")
+        row = cursor.fetchone()
+    if row is None or row[0] != 1:
+        return f"SELECT 1 returned {row!r}"
+    return None
+
+
+def check_migrations() -> str | None:
+    pending = unapplied_migrations(DEFAULT_DB_ALIAS)
+    if pending:
+        return f"unapplied: {', '.join(pending)}"
+    return None
+
+
+def check_cache() -> str | None:
+    key, token = "healthz:ready", uuid.uuid4().hex
+    cache.set(key, token, 30)
+    if cache.get(key) != token:
+        return "value written was not read back"
+    return None
+
+
+# name: check, returning None when healthy, else what is wrong (or raising)
+CHECKS: dict[str, Callable[[], str | None]] = {
+    "database": check_database,
+    "migrations": check_migrations,
+    "cache": check_cache,
+}
+
+
+class Readiness:
+    """The memoized result of the last round of CHECKS"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.result: dict[str, Any] | None = None
+        self.checked_at = 0.0
+        self.migrated = False
+
+    def fresh(self) -> dict[str, Any] | None:
+        """The memoized result while it is within HEALTH_CHECK_TTL, else None"""
+        result, age = self.result, time.monotonic() - self.checked_at
+        if result is None or age >= settings.HEALTH_CHECK_TTL:
+            return None
+        return {**result, "age": round(age, 1)}
+
+    def check(self) -> dict[str, Any]:
+        with self._lock:
+            # another thread may have just finished a round
+            result = self.fresh()
+            if result is not None:
+                return result
+            checks: dict[str, dict[str, Any]] = {}
+            for name, check in CHECKS.items():
+                if name == "migrations" and self.migrated:
+                    checks[name] = {"ok": True, "ms": 0.0}
+                    continue
+                start = time.perf_counter()
+                try:
+                    error = check()
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    error = f"{type(exc).__name__}: {exc}"
+                checks[name] = {
+                    "ok": error is None,
+                    "ms": round((time.perf_counter() - start) * 1000, 1),
+                }
+                if error is not None:
+                    checks[name]["error"] = error
+            self.migrated = self.migrated or bool(
+                checks.get("migrations", {}).get("ok")
+            )
+            ok = all(check["ok"] for check in checks.values())
+            self.result = {"status": "ok" if ok else "fail", "checks": checks}
+            self.checked_at = time.monotonic()
+            return {**self.result, "age": 0.0}
+
+
+readiness = Readiness()
+
+
+def _ready_response(result: dict[str, Any]) -> JsonResponse:
+    return JsonResponse(
+        result,
+        status=200 if result["status"] == "ok" else 503,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def live_view(request: HttpRequest) -> JsonResponse:
+    """The process is answering"""
+    return JsonResponse({"status": "ok"})
+
+
+async def async_live_view(request: HttpRequest) -> JsonResponse:
+    """live_view for ASGI: answered on the event loop, no thread hop"""
+    return JsonResponse({"status": "ok"})
+
+
+def ready_view(request: HttpRequest) -> JsonResponse:
+    """The dependencies answer (memoized, see Readiness)"""
+    return _ready_response(readiness.check())
+
+
+async def async_ready_view(request: HttpRequest) -> JsonResponse:
+    """ready_view for ASGI: a memoized result without a thread hop"""
+    result = readiness.fresh()
+    if result is None:
+        # the checks use the ORM: in a thread (sync_to_async is thread sensitive)
+        result = await sync_to_async(readiness.check)()
+    return _ready_response(result)
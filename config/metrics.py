@@ -0,0 +1,266 @@
+"""
+Per-view request metrics
+
+MetricsMiddleware times every request, counts its database queries and their
+time (through connection.execute_wrapper), adds a Server-Timing header and
+aggregates the numbers per URL name. The staff-only /metrics/ view exposes
+them in the Prometheus text format, along with the database connection
+acquisition times and pool counters (see config/db.py).
+
+Enable with METRICS_ENABLED=True. When disabled the middleware removes itself
+from the chain at startup (MiddlewareNotUsed), so it costs nothing.
+Metrics are kept per process: scrape each worker, or sum them upstream.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import Http404, HttpRequest, HttpResponse
+
+from accounts.ratelimit import ratelimit_stats
+from config.db import BUCKETS as DB_BUCKETS, acquire_stats, pool_stats
+from notes.cache import cache_stats
+
+# Histogram bucket upper bounds (seconds)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class ViewStats:
+    """Running totals for one (view, method) pair"""
+
+    def __init__(self) -> None:
+        # one slot per bucket plus +Inf
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.duration = 0.0
+        self.db_queries = 0
+        self.db_duration = 0.0
+
+    def observe(self, duration: float, db_queries: int, db_duration: float) -> None:
+        self.buckets[bisect_left(BUCKETS, duration)] += 1
+        self.count += 1
+        self.duration += duration
+        self.db_queries += db_queries
+        self.db_duration += db_duration
+
+
+class Registry:
+    """Thread-safe collection of ViewStats keyed by (view, method)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._views: dict[tuple[str, str], ViewStats] = defaultdict(ViewStats)
+
+    def observe(self, view: str, method: str, *args: Any) -> None:
+        with self._lock:
+            self._views[(view, method)].observe(*args)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._views.clear()
+
+    def render(self) -> str:
+        """The collected metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by view.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            views = sorted(self._views.items())
+            for (view, method), stats in views:
+                labels = f'view="{view}",method="{method}"'
+                cumulative = 0
+                for bound, hits in zip(BUCKETS + ("+Inf",), stats.buckets):
+                    cumulative += hits
+                    lines.append(
+                        f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}}'
+                        f" {cumulative}"
+                    )
+                lines.append(
+                    f"http_request_duration_seconds_sum{{{labels}}} {stats.duration}"
+                )
+                lines.append(
+                    f"http_request_duration_seconds_count{{{labels}}} {stats.count}"
+                )
+            lines += [
+                "# HELP http_request_db_queries_total Database queries by view.",
+                "# TYPE http_request_db_queries_total counter",
+            ]
+            for (view, method), stats in views:
+                lines.append(
+                    f'http_request_db_queries_total{{view="{view}",method="{method}"}}'
+                    f" {stats.db_queries}"
+                )
+            lines += [
+                "# HELP http_request_db_duration_seconds_total Database time by view.",
+                "# TYPE http_request_db_duration_seconds_total counter",
+            ]
+            for (view, method), stats in views:
+                lines.append(
+                    "http_request_db_duration_seconds_total"
+                    f'{{view="{view}",method="{method}"}} {stats.db_duration}'
+                )
+
+        for name, value in cache_stats().items():
+            lines += [
+                f"# TYPE notes_topics_cache_{name}_total counter",
+                f"notes_topics_cache_{name}_total {value}",
+            ]
+        lines += [
+            "# HELP accounts_ratelimit_rejected_total Requests refused with 429.",
+            "# TYPE accounts_ratelimit_rejected_total counter",
+        ]
+        for (scope, kind), value in sorted(ratelimit_stats().items()):
+            lines.append(
+                f'accounts_ratelimit_rejected_total{{scope="{scope}",key="{kind}"}}'
+                f" {value}"
+            )
+        lines += database_lines()
+        return "\n".join(lines) + "\n"
+
+
+# psycopg_pool get_stats() keys: (metric, type, help)
+POOL_STATS = {
+    "pool_size": ("db_pool_size", "gauge", "Connections in the pool (busy or idle)."),
+    "pool_available": ("db_pool_available", "gauge", "Idle pooled connections."),
+    "requests_waiting": (
+        "db_pool_requests_waiting",
+        "gauge",
+        "Requests waiting for a connection now.",
+    ),
+    "requests_num": (
+        "db_pool_requests_total",
+        "counter",
+        "Connections requested from the pool.",
+    ),
+    "requests_queued": (
+        "db_pool_requests_queued_total",
+        "counter",
+        "Requests that had to wait for a connection.",
+    ),
+    "requests_errors": (
+        "db_pool_requests_errors_total",
+        "counter",
+        "Requests that timed out waiting.",
+    ),
+    "connections_lost": (
+        "db_pool_connections_lost_total",
+        "counter",
+        "Broken connections found by the health check.",
+    ),
+}
+
+
+def database_lines() -> list[str]:
+    """Connection acquisition histogram and pool counters (see config/db.py)"""
+    buckets, count, total = acquire_stats.snapshot()
+    lines = [
+        "# HELP db_connection_acquire_seconds Time to connect or get a pooled"
+        " connection.",
+        "# TYPE db_connection_acquire_seconds histogram",
+    ]
+    cumulative = 0
+    for bound, hits in zip(DB_BUCKETS + ("+Inf",), buckets):
+        cumulative += hits
+        lines.append(
+            f'db_connection_acquire_seconds_bucket{{le="{bound}"}} {cumulative}'
+        )
+    lines += [
+        f"db_connection_acquire_seconds_sum {total}",
+        f"db_connection_acquire_seconds_count {count}",
+    ]
+    pools = pool_stats()
+    for name, (metric, kind, help_text) in POOL_STATS.items():
+        if not pools:
+            break
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        for alias, stats in sorted(pools.items()):
+            lines.append(f'{metric}{{alias="{alias}"}} {stats.get(name, 0)}')
+    return lines
+
+
+registry = Registry()
+
+
+class QueryTimer:
+    """connection.execute_wrapper that counts and times the queries it sees"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(
+        self, execute: Callable, sql: str, params: Any, many: bool, context: dict
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Record latency and database work per URL name (see module docstring)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.is_async:
+            return self.__acall__(request)
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        return self.record(request, response, timer, time.perf_counter() - start)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        timer = QueryTimer()
+        start = time.perf_counter()
+        # Under ASGI the ORM runs in the request's (thread-sensitive) sync
+        #   thread, which has its own connection: install the wrapper there
+        await sync_to_async(lambda: connection.execute_wrappers.append(timer))()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(lambda: connection.execute_wrappers.remove(timer))()
+        return self.record(request, response, timer, time.perf_counter() - start)
+
+    @staticmethod
+    def record(
+        request: HttpRequest, response: HttpResponse, timer: QueryTimer, duration: float
+    ) -> HttpResponse:
+        match = request.resolver_match
+        view = match.view_name if match and match.view_name else "unmatched"
+        registry.observe(view, request.method, duration, timer.count, timer.duration)
+
+        response["Server-Timing"] = (
+            f"app;dur={duration * 1000:.1f}, "
+            f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries"'
+        )
+        return response
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Aggregated request metrics for staff users (Prometheus text format)"""
+    if not settings.METRICS_ENABLED or not request.user.is_staff:
+        raise Http404
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,23 @@
+"""
+Django's PostgreSQL backend, timing how long each connection takes to get
+
+Selected by settings for PostgreSQL DB_URLs (ENGINE = "config.postgresql");
+everything else, including the connection pool, is the stock backend.
+"""
+
+import time
+from typing import Any
+
+from django.db.backends.postgresql import base
+
+from config.db import acquire_stats
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params: dict) -> Any:
+        # a connect, or with DB_POOL=True a wait for a pooled connection
+        start = time.perf_counter()
+        try:
+            return super().get_new_connection(conn_params)
+        finally:
+            acquire_stats.observe(time.perf_counter() - start)
@@ -0,0 +1,20 @@
+"""
+JSON reports of the benchmark and profiling management commands
+
+The report is printed to stdout and, with --output, also written to a file.
+"""
+
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+
+def write_report(
+    command: BaseCommand, report: dict[str, Any], path: str | None
+) -> None:
+    output = json.dumps(report, indent=2)
+    command.stdout.write(output)
+    if path:
+        with open(path, "w", encoding="utf-8") as report_file:
+            report_file.write(output + "\n")
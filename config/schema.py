@@ -0,0 +1,22 @@
+"""
+Migration state of a database
+
+Shared by migrate_if_needed (run before the server forks, see gunicorn.conf.py)
+and the readiness probe (config/health.py): comparing the migration files with
+the django_migrations table takes one query, against the seconds a no-op
+"migrate" spends on system checks and post_migrate handlers.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+
+def unapplied_migrations(database: str = DEFAULT_DB_ALIAS) -> list[str]:
+    """The migrations migrate would apply, as 'app.name' strings"""
+    executor = MigrationExecutor(connections[database])
+    targets = executor.loader.graph.leaf_nodes()
+    return [
+        f"{migration.app_label}.{migration.name}"
+        for migration, backwards in executor.migration_plan(targets)
+        if not backwards
+    ]
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 from pathlib import Path
+from typing import Any
 from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 import dj_database_url
@@ -66,15 +67,47 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
 ]
 
+# Per-view latency/query metrics, Server-Timing headers and /metrics/
+#   (the middleware drops out of the chain entirely when disabled)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False") == "True"
+
+# Identifies the deployed code (Render sets RENDER_GIT_COMMIT); part of the
+#   page ETags so a release invalidates browsers' cached pages
+APP_RELEASE = os.getenv("RENDER_GIT_COMMIT", "")
+
+# Native async read views (notes/async_views.py) for ASGI deployments
+#   (uvicorn, see render.yaml); keep False under gunicorn/WSGI
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
+# With TOPIC_SOFT_DELETE=True deleting a topic moves it to the trash (hidden
+#   at once, purged in batches by "manage.py purge_trash", see
+#   notes/deletion.py) instead of deleting its entries in the request. Only
+#   turn it on where purge_trash runs on a schedule
+TOPIC_SOFT_DELETE = os.getenv("TOPIC_SOFT_DELETE", "False") == "True"
+
+# Seconds each /api/sync/ cursor is set back, so a write stamped before the
+#   cursor but committed after the sync read it still shows up next time
+SYNC_CURSOR_OVERLAP = float(os.getenv("SYNC_CURSOR_OVERLAP", "60"))
+
+# Seconds a worker reuses its last readiness result (/healthz/ready/, see
+#   config/health.py) before checking the database, migrations and cache again
+HEALTH_CHECK_TTL = float(os.getenv("HEALTH_CHECK_TTL", "5"))
+
 MIDDLEWARE = [
+    # first, so the timings cover the rest of the chain
+    "config.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise, able to run on the event loop under ASGI
+    "config.static.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # request.user from the cache when AUTH_USER_CACHE=True (accounts/usercache.py)
+    "accounts.middleware.CachedAuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # 503 + Retry-After when the password hashing pool is full
+    "accounts.middleware.PoolSaturatedMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -83,13 +116,24 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
             ],
+            # Compile each template once per process (what APP_DIRS gave
+            #   implicitly, spelled out so it can't be lost by adding a loader);
+            #   runserver's autoreloader still resets it when a template changes
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
         },
     },
 ]
@@ -100,13 +144,130 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Without a pool each worker thread keeps its own connection for
+#   DB_CONN_MAX_AGE seconds (0: one per request), checked before reuse so a
+#   database restart doesn't turn into errors on the next request.
+# With DB_POOL=True (PostgreSQL with psycopg 3) each server process shares a
+#   psycopg_pool of DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections, checked
+#   (DB_CONN_HEALTH_CHECKS) when taken from the pool; a request waits up to
+#   DB_POOL_TIMEOUT seconds for one. Connections used: processes
+#   (WEB_CONCURRENCY) x DB_POOL_MAX_SIZE.
+DB_POOL = os.getenv("DB_POOL", "False") == "True"
 DATABASES = {
-    "default": dj_database_url.parse(DB_URL, conn_max_age=600),
+    "default": dj_database_url.parse(
+        DB_URL,
+        # the pool does the reuse (Django refuses persistent pooled connections)
+        conn_max_age=0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", "600")),
+        conn_health_checks=os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
+    ),
+}
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    # the stock backend, timing connection acquisition (see config/db.py)
+    DATABASES["default"]["ENGINE"] = "config.postgresql"
+    if DB_POOL:
+        DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "4")),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            # idle connections above min_size are closed after this long
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        }
+elif DB_POOL:
+    raise ImproperlyConfigured("DB_POOL=True needs a PostgreSQL DB_URL")
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory (per process) by default. For a shared cache point it at another
+#   backend, e.g.:
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   CACHE_LOCATION=redis://127.0.0.1:6379
+#   or CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+#   CACHE_LOCATION=/var/tmp/routine_saga_cache
+CACHES: dict[str, dict[str, Any]] = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "routine-saga"),
+    }
 }
+# Rendered entry cards ({% cache %} in notes/topic.html), keyed by entry id,
+#   date_modified and HTML so an edit never shows a stale card. Same backend,
+#   but for the local memory cache its own, larger store, so a 1,000-entry
+#   topic doesn't push the topics lists out
+CACHES["template_fragments"] = dict(CACHES["default"])
+if CACHES["default"]["BACKEND"].endswith(".LocMemCache"):
+    CACHES["template_fragments"].update(
+        LOCATION="routine-saga-fragments",
+        OPTIONS={"MAX_ENTRIES": int(os.getenv("FRAGMENT_CACHE_MAX_ENTRIES", "5000"))},
+    )
+
+# Whether the cache is shared by all server processes (the local memory cache
+#   is per process)
+SHARED_CACHE = not CACHES["default"]["BACKEND"].endswith(".LocMemCache")
+
+# Per-user topics lists (see notes/cache.py): on by default only with a shared
+#   cache, since a change invalidates them through a version kept in the cache
+#   and a per-process cache would leave the other processes' copies stale.
+#   Seconds a cached list may live (invalidated on change anyway)
+TOPICS_CACHE = os.getenv("TOPICS_CACHE", str(SHARED_CACHE)) == "True"
+TOPICS_CACHE_TIMEOUT = int(os.getenv("TOPICS_CACHE_TIMEOUT", "3600"))
+
+# Sessions: SESSION_BACKEND=db, cached_db (read from the cache, written through
+#   to the database), signed_cookies (in the cookie itself: no query, but a
+#   logout can't revoke copies of the cookie) or cache. cached_db is the
+#   default only with a shared cache: with the per-process local memory cache,
+#   a logout in one process wouldn't reach the session copies cached by the
+#   others
+SESSION_ENGINE = "django.contrib.sessions.backends." + os.getenv(
+    "SESSION_BACKEND", "cached_db" if SHARED_CACHE else "db"
+)
+# Keep session users in the cache instead of reading the user row on every
+#   request, for up to AUTH_USER_CACHE_TTL seconds (see accounts/usercache.py)
+AUTH_USER_CACHE = os.getenv("AUTH_USER_CACHE", "True") == "True"
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# Password hashing (see accounts/hashing.py)
+# PASSWORD_HASH_WORKERS > 0 hashes in a process pool of that many workers per
+#   server process, with at most PASSWORD_HASH_QUEUE jobs waiting (503 beyond)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "16"))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+
+# The pooled backend authenticates; ModelBackend stays listed for the sessions
+#   logged in through it (a session whose backend is missing is logged out)
+AUTHENTICATION_BACKENDS = [
+    "accounts.backends.PooledModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
+# Token-bucket rate limits for the login, registration and token views, per
+#   client IP and per username (see accounts/ratelimit.py); set
+#   RATELIMIT_PROXY_COUNT to the number of proxies in front of the app
+#   (1 on Render) so the client IP comes from X-Forwarded-For
+RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "True") == "True"
+RATELIMIT_PROXY_COUNT = int(os.getenv("RATELIMIT_PROXY_COUNT", "0"))
+RATELIMITS = {
+    "login": {"ip": "30/m", "username": "10/m"},
+    "register": {"ip": "5/m"},
+    "refresh": {"ip": "60/m"},
+}
+
+# PASSWORD_HASHER=argon2 makes Argon2 (argon2-cffi) the hasher for new
+#   passwords; existing PBKDF2 hashes are upgraded on the next login
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if os.getenv("PASSWORD_HASHER", "pbkdf2") == "argon2":
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(2))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": (
@@ -126,12 +287,29 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 # Use jwt tokens for authentication in
+# Stateless API auth: trust the signed token claims instead of loading the
+#   user on every request; a user's token version (password, staff and
+#   active flags) is re-read at most every JWT_USER_VERSION_TTL seconds per
+#   process, and at once in the process that changed it
+#   (see accounts/authentication.py)
+JWT_STATELESS_AUTH = os.getenv("JWT_STATELESS_AUTH", "False") == "True"
+JWT_USER_VERSION_TTL = int(os.getenv("JWT_USER_VERSION_TTL", "60"))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        (
+            "accounts.authentication.StatelessJWTAuthentication"
+            if JWT_STATELESS_AUTH
+            else "rest_framework_simplejwt.authentication.JWTAuthentication"
+        ),
     )
 }
 
+SIMPLE_JWT = {
+    # tokens carry the is_staff and version claims (accounts/tokens.py)
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.tokens.VersionedTokenObtainPairSerializer",
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -17,25 +17,25 @@ Including another urls.py (this will 'build up' the full endpoint path)
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.urls import path, include, re_path
+from django.http import HttpRequest, HttpResponse
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
 
+from accounts.ratelimit import ratelimit
+from config.health import async_live_view, async_ready_view, live_view, ready_view
+from config.metrics import metrics_view
+
 
 def home_view(request: HttpRequest) -> HttpResponse:
     """A minimal view to verify the deployment"""
     return HttpResponse("Forthcoming! A Django Routine Saga app!")
 
 
-def health_check(request: HttpRequest) -> JsonResponse:
-    """A pingable keepalive route for the hosting service to call"""
-    return JsonResponse({"status": "ok"})
-
-
 # define all urls for the website
 urlpatterns = [
     # admin endpoints
@@ -45,10 +45,38 @@ urlpatterns = [
     # main app site endpoints
     path("", include("notes.urls")),
     # infrastructure-related endpoints
-    path("healthz/", health_check),
+    # liveness (/healthz/ kept for existing monitors) and readiness probes
+    path(
+        "healthz/",
+        async_live_view if settings.ASYNC_VIEWS else live_view,
+        name="healthz",
+    ),
+    # with or without the slash: a probe may not follow the APPEND_SLASH
+    #   redirect, or may count the 301 itself as healthy
+    re_path(
+        r"^healthz/live/?$",
+        async_live_view if settings.ASYNC_VIEWS else live_view,
+        name="healthz_live",
+    ),
+    re_path(
+        r"^healthz/ready/?$",
+        async_ready_view if settings.ASYNC_VIEWS else ready_view,
+        name="healthz_ready",
+    ),
+    # per-view latency and query metrics, staff only (METRICS_ENABLED=True)
+    path("metrics/", metrics_view, name="metrics"),
     # jwt auth
     # for login and refresh access token
-    path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    # (both rate limited, see accounts/ratelimit.py)
+    path(
+        "api/token/",
+        ratelimit("login")(TokenObtainPairView.as_view()),
+        name="token_obtain_pair",
+    ),
     # refresh access token
-    path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path(
+        "api/token/refresh/",
+        ratelimit("refresh")(TokenRefreshView.as_view()),
+        name="token_refresh",
+    ),
 ]
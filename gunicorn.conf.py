@@ -0,0 +1,87 @@
+#
+# Gunicorn settings (read from the working directory by default)
+#   <project_root>$ gunicorn config.wsgi:application
+#   <project_root>$ gunicorn config.asgi:application -k uvicorn_worker.UvicornWorker
+#
+# preload_app imports Django once in the master and forks the workers from it:
+#   a worker starts in milliseconds instead of importing everything again, and
+#   the code pages are shared between them. With MIGRATE_ON_START=True the
+#   master then applies any unapplied migrations before the first worker starts
+#   (see notes/management/commands/migrate_if_needed.py), which saves booting
+#   a separate manage.py process just to find there is nothing to do.
+#
+# Every setting can be overridden from the environment (or the command line).
+#
+
+import gc
+import math
+import os
+
+
+def available_cpus() -> int:
+    """CPUs this container may use: the cgroup quota, else the affinity mask"""
+    try:
+        # cgroup v2, e.g. "50000 100000" for half a CPU, "max 100000" for no limit
+        with open("/sys/fs/cgroup/cpu.max", encoding="utf-8") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        return os.cpu_count() or 1
+
+
+CPUS = available_cpus()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# Requests mostly wait on the database: a few threads per process, and
+#   processes for the cores (WEB_CONCURRENCY is also what Render/Heroku set)
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(2 * CPUS + 1, 8))))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+# Recycle workers now and then (staggered) to bound slow memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "20"))
+keepalive = 5
+accesslog = "-"
+
+MIGRATE_ON_START = os.getenv("MIGRATE_ON_START", "False") == "True"
+
+
+def _close_connections() -> None:
+    """Close what the master opened: forked workers mustn't share it"""
+    # pylint: disable=import-outside-toplevel
+    from django.db import connections
+
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        # a psycopg_pool pool has sockets and threads of its own (DB_POOL)
+        if hasattr(connection, "close_pool"):
+            connection.close_pool()
+
+
+def on_starting(server) -> None:  # pylint: disable=unused-argument
+    if not MIGRATE_ON_START:
+        return
+    # pylint: disable=import-outside-toplevel
+    import django
+    from django.core.management import call_command
+
+    # already done when the app was preloaded
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+    call_command("migrate_if_needed")
+    _close_connections()
+
+
+def when_ready(server) -> None:  # pylint: disable=unused-argument
+    if preload_app:
+        # keep the preloaded objects out of the workers' garbage collections,
+        #   which would otherwise write to (and so copy) every shared page
+        gc.freeze()
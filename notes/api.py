@@ -0,0 +1,317 @@
+"""
+JSON REST API for Topics and Entries
+
+Authentication uses the project-wide REST_FRAMEWORK JWTAuthentication setting:
+send the access token from /api/token/ as 'Authorization: Bearer <token>'.
+Every queryset is scoped to the requesting user, so other users' objects
+simply 404.
+"""
+
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from rest_framework import generics, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import invalidate_user_topics
+from .conditional import conditional, topics_validators
+from .deletion import delete_topic
+from .export import FORMATS as EXPORT_FORMATS, export_response
+from .importer import FORMATS as IMPORT_FORMATS, detect_format, import_notes
+from .models import Topic, Entry, Tombstone
+from .search import search
+from .serializers import (
+    MAX_BULK_ITEMS,
+    TopicSerializer,
+    EntrySerializer,
+    BulkEntryCreateSerializer,
+    BulkEntryUpdateSerializer,
+    BulkEntryDeleteSerializer,
+)
+
+
+class EntryCursorPagination(CursorPagination):
+    """Newest first, keyed on the same (date_added, id) index as the topic page"""
+
+    page_size = 100
+    ordering = ("-date_added", "-id")
+
+
+##
+# Topics
+#
+class TopicList(generics.ListCreateAPIView):
+    """GET: list the user's topics, POST: create a topic"""
+
+    serializer_class = TopicSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self) -> QuerySet:
+        return Topic.objects.for_user(self.request.user).order_by("date_added")
+
+    # 304 Not Modified for an unchanged list (If-None-Match)
+    @method_decorator(conditional(topics_validators))
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        return super().get(request, *args, **kwargs)
+
+    def perform_create(self, serializer: TopicSerializer) -> None:
+        serializer.save(owner_id=self.request.user.pk)
+
+
+class TopicDetail(generics.RetrieveUpdateDestroyAPIView):
+    """GET/PUT/PATCH/DELETE a single topic (deleting also removes its entries)"""
+
+    serializer_class = TopicSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self) -> QuerySet:
+        return Topic.objects.for_user(self.request.user)
+
+    def perform_destroy(self, instance: Topic) -> None:
+        # trashed, its entries purged later (see deletion.py)
+        delete_topic(instance)
+
+
+##
+# Entries
+#
+class EntryList(generics.ListCreateAPIView):
+    """GET: list the user's entries (optionally ?topic=<id>), POST: create one"""
+
+    serializer_class = EntrySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = EntryCursorPagination
+
+    def get_queryset(self) -> QuerySet:
+        entries = Entry.objects.for_user(self.request.user)
+        topic_id = self.request.query_params.get("topic")
+        if topic_id and topic_id.isdigit():
+            entries = entries.filter(topic_id=topic_id)
+        return entries
+
+
+class EntryDetail(generics.RetrieveUpdateDestroyAPIView):
+    """GET/PUT/PATCH/DELETE a single entry"""
+
+    serializer_class = EntrySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self) -> QuerySet:
+        return Entry.objects.for_user(self.request.user)
+
+
+class EntryBulk(APIView):
+    """
+    Bulk entry operations, each executed in a single transaction
+
+    POST:   [{"topic": <id>, "text": "..."}, ...]          -> bulk_create
+    PATCH:  [{"id": <id>, "text": "...", "topic": <id>}, ...] -> bulk_update
+    DELETE: {"ids": [<id>, ...]}                            -> one DELETE
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def _validate_items(self, request: Request, serializer_class: type) -> list:
+        """Validate a JSON array payload, raising a 400 on any invalid row"""
+        if not isinstance(request.data, list) or not request.data:
+            raise ValidationError({"detail": "Expected a non-empty JSON array."})
+        if len(request.data) > MAX_BULK_ITEMS:
+            raise ValidationError(
+                {"detail": f"At most {MAX_BULK_ITEMS} items per request."}
+            )
+        serializer = serializer_class(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        return list(serializer.validated_data)
+
+    def _check_topics(self, request: Request, items: list) -> None:
+        """Check every referenced topic belongs to the user with one query"""
+        wanted = {item["topic"] for item in items if "topic" in item}
+        owned = set(
+            Topic.objects.for_user(request.user)
+            .filter(id__in=wanted)
+            .values_list("id", flat=True)
+        )
+        if wanted - owned:
+            raise ValidationError(
+                {"detail": f"Unknown topic ids: {sorted(wanted - owned)}"}
+            )
+
+    def post(self, request: Request) -> Response:
+        items = self._validate_items(request, BulkEntryCreateSerializer)
+        self._check_topics(request, items)
+
+        with transaction.atomic():
+            entries = Entry.objects.bulk_create(
+                [Entry(topic_id=item["topic"], text=item["text"]) for item in items]
+            )
+        # bulk_create() sends no signals
+        invalidate_user_topics(request.user.pk)
+        return Response(
+            EntrySerializer(entries, many=True).data, status=status.HTTP_201_CREATED
+        )
+
+    def patch(self, request: Request) -> Response:
+        items = self._validate_items(request, BulkEntryUpdateSerializer)
+        self._check_topics(request, items)
+
+        with transaction.atomic():
+            entries = (
+                Entry.objects.for_user(request.user)
+                .select_for_update(of=("self",))
+                .in_bulk([item["id"] for item in items])
+            )
+            missing = [item["id"] for item in items if item["id"] not in entries]
+            if missing:
+                raise ValidationError({"detail": f"Unknown entry ids: {missing}"})
+
+            # bulk_update() skips auto_now, so stamp the change for sync clients
+            now = timezone.now()
+            fields = {"date_modified"}
+            for item in items:
+                entry = entries[item["id"]]
+                entry.date_modified = now
+                if "text" in item:
+                    entry.text = item["text"]
+                    fields.add("text")
+                if "topic" in item:
+                    entry.topic_id = item["topic"]
+                    fields.add("topic")
+            Entry.objects.bulk_update(entries.values(), sorted(fields))
+        invalidate_user_topics(request.user.pk)
+
+        return Response(EntrySerializer(entries.values(), many=True).data)
+
+    def delete(self, request: Request) -> Response:
+        serializer = BulkEntryDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            entries = Entry.objects.for_user(request.user).filter(
+                id__in=serializer.validated_data["ids"]
+            )
+            # counted off the topics, tombstoned (and the topics cache
+            #   refreshed) by EntryQuerySet.delete()
+            deleted, _ = entries.delete()
+        return Response({"deleted": deleted})
+
+
+class Sync(APIView):
+    """
+    Incremental sync for offline clients: GET /api/sync/?since=<cursor>
+
+    Without 'since' the response is a full snapshot. Every response carries a
+    new 'cursor' to send next time, and lists the topics and entries created or
+    modified since the previous cursor plus the ids deleted since then (a
+    deleted topic implies its entries are gone too). The cursor is set back
+    SYNC_CURSOR_OVERLAP seconds, so a write that committed after this sync read
+    the tables (stamped before it did) still comes next time: a client sees
+    unchanged rows and deletions more than once, and should apply rows as
+    upserts and ignore ids it no longer has.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request: Request) -> Response:
+        # Take the new cursor before querying, minus the overlap, so nothing
+        #   written (or still being committed) meanwhile falls between this
+        #   sync and the next one
+        cursor = timezone.now() - timedelta(seconds=settings.SYNC_CURSOR_OVERLAP)
+        since = request.query_params.get("since")
+        since_time = None
+        if since:
+            try:
+                since_time = datetime.fromisoformat(since)
+            except ValueError as exc:
+                raise ValidationError({"since": "Invalid cursor."}) from exc
+            if timezone.is_naive(since_time):
+                raise ValidationError({"since": "Invalid cursor."})
+
+        topics = Topic.objects.for_user(request.user)
+        entries = Entry.objects.for_user(request.user)
+        tombstones = Tombstone.objects.filter(owner_id=request.user.pk)
+        if since_time is not None:
+            topics = topics.filter(date_modified__gte=since_time)
+            entries = entries.filter(date_modified__gte=since_time)
+            tombstones = tombstones.filter(date_deleted__gte=since_time)
+        else:
+            # A full snapshot has nothing to delete on the client
+            tombstones = tombstones.none()
+
+        deleted: dict[str, list[int]] = {Tombstone.TOPIC: [], Tombstone.ENTRY: []}
+        for kind, object_id in tombstones.values_list("kind", "object_id"):
+            deleted[kind].append(object_id)
+
+        return Response(
+            {
+                # UTC with a 'Z' suffix keeps the cursor safe to put in a URL
+                "cursor": cursor.isoformat().replace("+00:00", "Z"),
+                "topics": TopicSerializer(topics.order_by("id"), many=True).data,
+                "entries": EntrySerializer(entries.order_by("id"), many=True).data,
+                "deleted": {
+                    "topics": deleted[Tombstone.TOPIC],
+                    "entries": deleted[Tombstone.ENTRY],
+                },
+            }
+        )
+
+
+class Search(APIView):
+    """Ranked full-text search of the user's topics and entries: ?q=<terms>"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request: Request) -> Response:
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": "This parameter is required."})
+        results = search(request.user.pk, query)
+        return Response(
+            {
+                "topics": [asdict(hit) for hit in results.topics],
+                "entries": [asdict(hit) for hit in results.entries],
+            }
+        )
+
+
+class Export(APIView):
+    """Stream all of the user's notes as jsonl, csv or md (a zip of Markdown)"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request: Request, fmt: str) -> StreamingHttpResponse:
+        if fmt not in EXPORT_FORMATS:
+            raise NotFound
+        return export_response(request.user.pk, fmt)
+
+
+class Import(APIView):
+    """
+    Add the notes of an exported file: a multipart upload with a 'file' part
+    and an optional 'format' (jsonl, csv or md), else taken from the file
+    name. Responds with the counts, skipped rows and rows/second.
+    """
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request: Request) -> Response:
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "No file was submitted."})
+        fmt = request.data.get("format") or detect_format(upload.name)
+        if fmt not in IMPORT_FORMATS:
+            raise ValidationError({"format": f"One of {', '.join(IMPORT_FORMATS)}."})
+        result = import_notes(request.user.pk, upload, fmt)
+        return Response(result.as_dict(), status=status.HTTP_201_CREATED)
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class NotesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "notes"
+
+    def ready(self) -> None:
+        # pylint: disable=import-outside-toplevel,unused-import
+        from . import signals  # noqa: F401  registers the receivers
+        from .search import install_sqlite_fts
+
+        # SQLite full-text search fallback (a no-op on PostgreSQL)
+        post_migrate.connect(install_sqlite_fts, sender=self)
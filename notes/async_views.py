@@ -0,0 +1,50 @@
+"""
+Native async versions of the read-only notes views
+
+Served instead of the views.py functions of the same name when
+ASYNC_VIEWS=True (see urls.py). Under an ASGI server (uvicorn) they wait on
+the database with the async ORM instead of holding a worker thread for the
+whole request; under WSGI the sync views are faster, so keep the default.
+"""
+
+from django.contrib.auth.decorators import login_required
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import aget_object_or_404, render
+
+from .cache import aget_user_topics, topics_sort
+from .conditional import conditional, topic_validators, topics_validators
+from .models import Topic
+from .pagination import apaginate_entries, page_cursors
+
+
+async def _load_user(request: HttpRequest) -> None:
+    # Templates read request.user synchronously, which would query the
+    #   database from the event loop: resolve it first
+    request.user = await request.auser()
+
+
+async def index(request: HttpRequest) -> HttpResponse:
+    """Home page"""
+    await _load_user(request)
+    return render(request, "notes/index.html")
+
+
+@login_required
+@conditional(topics_validators)
+async def topics(request: HttpRequest) -> HttpResponse:
+    """Topics page"""
+    await _load_user(request)
+    sort = topics_sort(request.GET.get("sort"))
+    topics = await aget_user_topics(request.user.id, sort)
+    return render(request, "notes/topics.html", {"topics": topics, "sort": sort})
+
+
+@login_required
+@conditional(topic_validators)
+async def topic(request: HttpRequest, topic_id: int) -> HttpResponse:
+    """Show single topic list the entries"""
+    await _load_user(request)
+    topic = await aget_object_or_404(Topic.objects.for_user(request.user), id=topic_id)
+    page = await apaginate_entries(topic.entry_set.all(), *page_cursors(request.GET))
+    context = {"topic": topic, "entries": page.entries, "page": page}
+    return render(request, "notes/topic.html", context)
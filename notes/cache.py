@@ -0,0 +1,155 @@
+"""
+Per-user cache of the topics list
+
+Each user has a version number in the cache; the topic rows are stored under
+a key that includes it. Invalidating bumps the version rather than deleting
+the rows, so a request that read stale rows just before an update can't write
+them back under the live key. Invalidation is driven by the Topic/Entry
+post_save/post_delete signals (see notes/signals.py); bulk operations, which
+send no signals, call invalidate_user_topics() themselves.
+
+The cache backend comes from the CACHES setting (local memory by default).
+The version has to be seen by every server process, so the lists are only
+cached with TOPICS_CACHE, on by default with a shared cache (SHARED_CACHE);
+otherwise every request reads the topics from the database.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, QuerySet
+
+from .models import Topic
+
+# Bump when the shape of the cached rows changes to orphan all old entries
+CACHE_SCHEMA = 2
+
+# The orders the topics page offers (?sort=), "added" being the default;
+#   "activity" puts the most recently used topics first, unused ones last
+TOPIC_ORDERINGS = {
+    "added": ("date_added",),
+    "activity": (F("last_entry_at").desc(nulls_last=True), "-id"),
+}
+TOPIC_FIELDS = ("id", "text", "entry_count", "last_entry_at")
+
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(counter: str) -> None:
+    with _stats_lock:
+        _stats[counter] += 1
+
+
+def cache_stats() -> dict[str, int]:
+    """Hit/miss/invalidation counters for this process"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def topics_sort(value: str | None) -> str:
+    """The ?sort= value if it is a known ordering, else the default"""
+    return value if value in TOPIC_ORDERINGS else "added"
+
+
+def _version_key(user_id: int) -> str:
+    return f"notes:topics:version:{user_id}"
+
+
+def _topics_key(user_id: int, version: int, sort: str) -> str:
+    return f"notes:topics:{CACHE_SCHEMA}:{user_id}:{version}:{sort}"
+
+
+def _current_version(user_id: int) -> int:
+    version: int | None = cache.get(_version_key(user_id))
+    if version is None:
+        # Start from the clock (not 0) so an evicted version can never
+        #   resurrect rows cached under an older number
+        version = time.time_ns()
+        cache.add(_version_key(user_id), version, timeout=None)
+        version = cache.get(_version_key(user_id), version)
+    return version
+
+
+def _user_topics(user_id: int, sort: str) -> QuerySet:
+    return (
+        Topic.objects.filter(owner_id=user_id, trashed_at__isnull=True)
+        .order_by(*TOPIC_ORDERINGS[sort])
+        .values(*TOPIC_FIELDS)
+    )
+
+
+def get_user_topics(user_id: int, sort: str = "added") -> list[dict]:
+    """
+    The user's topics, served from the cache when possible
+
+    Args:
+        user_id (int): the owner of the topics
+        sort (str): one of TOPIC_ORDERINGS (oldest first by default)
+
+    Returns:
+        list[dict]: one {"id", "text", "entry_count", "last_entry_at"} row
+            per topic
+    """
+    if not settings.TOPICS_CACHE:
+        return list(_user_topics(user_id, sort))
+    key = _topics_key(user_id, _current_version(user_id), sort)
+    topics: list[dict] | None = cache.get(key)
+    if topics is not None:
+        _count("hits")
+        return topics
+
+    _count("misses")
+    topics = list(_user_topics(user_id, sort))
+    cache.set(key, topics, timeout=settings.TOPICS_CACHE_TIMEOUT)
+    return topics
+
+
+async def _acurrent_version(user_id: int) -> int:
+    version: int | None = await cache.aget(_version_key(user_id))
+    if version is None:
+        version = time.time_ns()
+        await cache.aadd(_version_key(user_id), version, timeout=None)
+        version = await cache.aget(_version_key(user_id), version)
+    return version
+
+
+async def aget_user_topics(user_id: int, sort: str = "added") -> list[dict]:
+    """Async version of get_user_topics() for the async views"""
+    if not settings.TOPICS_CACHE:
+        return [topic async for topic in _user_topics(user_id, sort)]
+    key = _topics_key(user_id, await _acurrent_version(user_id), sort)
+    topics: list[dict] | None = await cache.aget(key)
+    if topics is not None:
+        _count("hits")
+        return topics
+
+    _count("misses")
+    topics = [topic async for topic in _user_topics(user_id, sort)]
+    await cache.aset(key, topics, timeout=settings.TOPICS_CACHE_TIMEOUT)
+    return topics
+
+
+def invalidate_user_topics(user_id: int) -> None:
+    """
+    Drop the user's cached topics list by moving it to a new version
+
+    Runs once the current transaction commits (immediately in autocommit), so
+    a concurrent request can't re-cache rows that are about to change.
+    """
+
+    if not settings.TOPICS_CACHE:
+        return
+
+    def bump() -> None:
+        _count("invalidations")
+        try:
+            cache.incr(_version_key(user_id))
+        except ValueError:
+            # No version stored yet (or it was evicted): nothing can be stale
+            pass
+
+    transaction.on_commit(bump)
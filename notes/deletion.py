@@ -0,0 +1,90 @@
+"""
+Deleting topics without loading their entries
+
+A topic with 100k entries used to be deleted through Django's collector,
+which loads every entry (and sends a post_delete signal for each) before
+deleting anything. Two changes avoid that:
+
+    DB_CASCADE (models.py)  on PostgreSQL the database deletes a topic's
+                            entries, and a user's topics, itself (ON DELETE
+                            CASCADE, migration 0010); Django collects nothing
+    the trash               with TOPIC_SOFT_DELETE (off by default) deleting a
+                            topic only sets Topic.trashed_at: the topic and
+                            its entries vanish from every page and API call at
+                            once, and purge_trash() deletes them later
+
+purge_trash() removes the entries in batches of a few thousand rows, one short
+transaction each, so deleting a large topic never holds locks (or the WAL) for
+long; with the trash on, run it on a schedule (a cron job):
+    python manage.py purge_trash
+"""
+
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidate_user_topics
+from .models import Topic, Entry, Tombstone
+
+
+def delete_topic(topic: Topic) -> None:
+    """Delete (or, with TOPIC_SOFT_DELETE, trash) one of the user's topics"""
+    if not settings.TOPIC_SOFT_DELETE:
+        topic.delete()
+        return
+    with transaction.atomic():
+        # update() sends no signals: refresh the owner's topics list and leave
+        #   the marker for sync clients (the entries go with the topic) here
+        Topic.objects.filter(id=topic.id).update(trashed_at=timezone.now())
+        Tombstone.record(topic.owner_id, Tombstone.TOPIC, [topic.id])
+        invalidate_user_topics(topic.owner_id)
+
+
+def purge_trash(
+    batch_size: int = 5000,
+    pause: float = 0.0,
+    progress: Callable[[int, int], None] | None = None,
+    owner_id: int | None = None,
+) -> tuple[int, int]:
+    """
+    Delete the trashed topics and their entries, batch_size entries at a time
+
+    Args:
+        owner_id (int): only purge this user's trash (default: everyone's)
+
+    Returns:
+        tuple[int, int]: the number of topics and entries deleted
+    """
+    topics = entries = 0
+    trashed = Topic.objects.filter(trashed_at__isnull=False).order_by("trashed_at")
+    if owner_id is not None:
+        trashed = trashed.filter(owner_id=owner_id)
+    for topic_id in list(trashed.values_list("id", flat=True)):
+        while True:
+            batch = Entry.objects.filter(topic_id=topic_id).values("id")[:batch_size]
+            with transaction.atomic():
+                # one DELETE ... WHERE id IN (SELECT ... LIMIT n): the entries
+                #   are going with a topic nobody sees, so there are no signals
+                #   or counters to run for them. delete() can't do that: Entry
+                #   has a post_delete receiver (signals.py), so the collector
+                #   would load every entry to send it, and EntryQuerySet.delete()
+                #   adds a tombstone per entry (tested in TopicTrashTest)
+                # pylint: disable-next=protected-access
+                deleted = Entry.objects.filter(id__in=batch)._raw_delete(
+                    Entry.objects.db
+                )
+            entries += deleted
+            if progress:
+                progress(topics, entries)
+            if deleted < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        # empty now, so nothing is left for the collector (or a cascade) to do
+        topics += Topic.objects.filter(id=topic_id).delete()[1].get("notes.Topic", 0)
+        if progress:
+            progress(topics, entries)
+    return topics, entries
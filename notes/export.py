@@ -0,0 +1,230 @@
+"""
+Streaming export of a user's notes
+
+Every format is a generator of chunks fed from queryset.iterator(), so memory
+use stays the same whatever the size of the account:
+
+    jsonl: one JSON object per line, topics first, then entries
+    csv:   the same records as rows (type, id, topic, text, date_added)
+    md:    a zip archive with one Markdown file per topic: '# topic', then a
+           '## date' heading before each entry. An entry line that would read
+           as one of those headings gets a backslash in front (one more for
+           a line already starting with backslashes), removed on import
+
+importer.py reads all three back.
+
+Under an ASGI server (ASYNC_VIEWS=True) Django would read a sync iterator to
+the end before sending anything; the response gets an async iterator instead,
+which pulls a few chunks at a time from the generator in the request's thread.
+"""
+
+import csv
+import io
+import json
+import re
+import time
+import zipfile
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import AsyncIterator, Iterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.text import slugify
+
+from .models import Topic, Entry
+
+# Rows fetched per round trip (a server-side cursor on PostgreSQL)
+CHUNK_SIZE = 2000
+
+# Approximate size of each chunk handed to the response
+CHUNK_BYTES = 64 * 1024
+
+# Chunks taken from the generator per trip to its thread under ASGI
+ASYNC_BATCH = 4
+
+CSV_FIELDS = ["type", "id", "topic", "text", "date_added"]
+
+# Entry lines the Markdown importer would take for a heading, escaped or not
+MARKDOWN_HEADING = re.compile(r"^(\\*#{1,2} )", re.MULTILINE)
+
+# format -> (content type, file extension)
+FORMATS = {
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "csv": ("text/csv", "csv"),
+    "md": ("application/zip", "zip"),
+}
+
+
+def _records(user_id: int) -> Iterator[dict]:
+    """The user's topics then entries as plain dicts (the export schema)"""
+    topics = (
+        Topic.objects.filter(owner_id=user_id, trashed_at__isnull=True)
+        .order_by("id")
+        .values_list("id", "text", "date_added")
+    )
+    for pk, text, date_added in topics.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            "type": "topic",
+            "id": pk,
+            "text": text,
+            "date_added": date_added.isoformat(),
+        }
+    entries = (
+        Entry.objects.filter(topic__owner_id=user_id, topic__trashed_at__isnull=True)
+        .order_by("topic_id", "date_added", "id")
+        .values_list("id", "topic_id", "text", "date_added")
+    )
+    for pk, topic_id, text, date_added in entries.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            "type": "entry",
+            "id": pk,
+            "topic": topic_id,
+            "text": text,
+            "date_added": date_added.isoformat(),
+        }
+
+
+def _coalesce(pieces: Iterator[str]) -> Iterator[str]:
+    """Join small pieces into chunks of about CHUNK_BYTES"""
+    batch: list[str] = []
+    size = 0
+    for piece in pieces:
+        batch.append(piece)
+        size += len(piece)
+        if size >= CHUNK_BYTES:
+            yield "".join(batch)
+            batch, size = [], 0
+    if batch:
+        yield "".join(batch)
+
+
+def export_jsonl(user_id: int) -> Iterator[str]:
+    return _coalesce(json.dumps(record) + "\n" for record in _records(user_id))
+
+
+def _csv_rows(user_id: int) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for record in _records(user_id):
+        writer.writerow(record)
+        # hand over what was written and start the buffer again
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_csv(user_id: int) -> Iterator[str]:
+    return _coalesce(_csv_rows(user_id))
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream collecting what zipfile writes, drained by the caller"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.chunks: list[bytes] = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        self.size = 0
+        return data
+
+
+def _markdown_member(topic_id: int, text: str) -> zipfile.ZipInfo:
+    """Archive entry for a topic, e.g. 000042-effective-use-of-logging.md"""
+    info = zipfile.ZipInfo(
+        f"{topic_id:06d}-{slugify(text)[:50] or 'topic'}.md",
+        date_time=time.localtime()[:6],
+    )
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+def export_markdown_zip(user_id: int) -> Iterator[bytes]:
+    """A zip with one Markdown file per topic, built while it is streamed"""
+    sink = _ChunkSink()
+    # zipfile falls back to data descriptors on a stream it can't seek
+    with zipfile.ZipFile(sink, "w") as archive:
+        topics = dict(
+            Topic.objects.filter(owner_id=user_id, trashed_at__isnull=True)
+            .order_by("id")
+            .values_list("id", "text")
+        )
+        entries = (
+            Entry.objects.filter(
+                topic__owner_id=user_id, topic__trashed_at__isnull=True
+            )
+            .order_by("topic_id", "date_added", "id")
+            .values_list("topic_id", "text", "date_added")
+        )
+        for topic_id, rows in groupby(
+            entries.iterator(chunk_size=CHUNK_SIZE), key=itemgetter(0)
+        ):
+            # (a topic created mid-export may be missing from the map)
+            title = topics.pop(topic_id, "Untitled")
+            with archive.open(
+                _markdown_member(topic_id, title), "w", force_zip64=True
+            ) as member:
+                member.write(f"# {title}\n\n".encode())
+                for _, text, date_added in rows:
+                    text = MARKDOWN_HEADING.sub(r"\\\1", text)
+                    member.write(
+                        f"## {date_added:%Y-%m-%d %H:%M}\n\n{text}\n\n".encode()
+                    )
+                    if sink.size >= CHUNK_BYTES:
+                        yield sink.drain()
+
+        # topics that have no entries yet
+        for topic_id, text in topics.items():
+            archive.writestr(_markdown_member(topic_id, text), f"# {text}\n")
+            if sink.size >= CHUNK_BYTES:
+                yield sink.drain()
+    yield sink.drain()
+
+
+def export_stream(user_id: int, fmt: str) -> Iterator:
+    """The chunk generator for one of FORMATS"""
+    return {
+        "jsonl": export_jsonl,
+        "csv": export_csv,
+        "md": export_markdown_zip,
+    }[
+        fmt
+    ](user_id)
+
+
+async def _async_chunks(chunks: Iterator) -> AsyncIterator:
+    """chunks for an ASGI response, ASYNC_BATCH at a time"""
+    # thread sensitive: the request's thread, where its database connection is
+    next_batch = sync_to_async(lambda: list(islice(chunks, ASYNC_BATCH)))
+    while batch := await next_batch():
+        for chunk in batch:
+            yield chunk
+
+
+def export_response(user_id: int, fmt: str) -> StreamingHttpResponse:
+    """A streamed download of the user's notes in one of FORMATS"""
+    content_type, extension = FORMATS[fmt]
+    chunks = export_stream(user_id, fmt)
+    response = StreamingHttpResponse(
+        _async_chunks(chunks) if settings.ASYNC_VIEWS else chunks,
+        content_type=content_type,
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="routine-saga-notes.{extension}"'
+    )
+    return response
@@ -22,3 +22,18 @@ class EntryForm(forms.ModelForm):
         40-char column width for a more lengthy note
         """
         widgets = {"text": forms.Textarea(attrs={"cols": 80})}
+
+
+# Upload of a file written by the export links (see importer.py)
+class ImportForm(forms.Form):
+    file = forms.FileField(label="File")
+    format = forms.ChoiceField(
+        label="Format",
+        required=False,
+        choices=[
+            ("", "From the file name"),
+            ("jsonl", "JSON Lines"),
+            ("csv", "CSV"),
+            ("md", "Markdown (zip)"),
+        ],
+    )
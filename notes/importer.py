@@ -0,0 +1,235 @@
+"""
+Streaming import of notes
+
+Reads the formats written by notes/export.py (jsonl, csv, or md: a zip of
+Markdown files, one per topic) record by record, validates each one with the
+TopicForm/EntryForm field rules, and inserts them with bulk_create in batches,
+one transaction per batch. Invalid rows are skipped and reported rather than
+failing the whole import.
+
+Imported rows get fresh ids and timestamps; the order of the file is kept.
+"""
+
+import csv
+import io
+import json
+import re
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import IO, Iterator
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .cache import invalidate_user_topics
+from .forms import TopicForm, EntryForm
+from .models import Topic, Entry
+
+# Rows per INSERT (and per transaction)
+BATCH_SIZE = 5000
+# Only the first few row errors are kept for the report
+MAX_REPORTED_ERRORS = 50
+
+FORMATS = ("jsonl", "csv", "md")
+
+# An entry line escaped by the Markdown export (see export.py)
+ESCAPED_HEADING = re.compile(r"^\\(\\*#{1,2} )")
+
+
+@dataclass
+class ImportResult:
+    topics: int = 0
+    entries: int = 0
+    skipped: int = 0
+    errors: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        rows = self.topics + self.entries
+        return rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "topics": self.topics,
+            "entries": self.entries,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+def detect_format(filename: str) -> str | None:
+    """The import format for a file name, e.g. notes.jsonl -> 'jsonl'"""
+    extension = filename.rsplit(".", 1)[-1].lower()
+    return {"jsonl": "jsonl", "ndjson": "jsonl", "csv": "csv", "zip": "md"}.get(
+        extension
+    )
+
+
+##
+# Readers: (row number, record) pairs using the export schema
+#
+def _read_jsonl(stream: IO[bytes]) -> Iterator[tuple[int, dict]]:
+    for number, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8"), 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = {}
+        yield number, record if isinstance(record, dict) else {}
+
+
+def _read_csv(stream: IO[bytes]) -> Iterator[tuple[int, dict]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    # row 1 is the header
+    for number, row in enumerate(csv.DictReader(text), 2):
+        yield number, row
+
+
+def _read_markdown_zip(stream: IO[bytes]) -> Iterator[tuple[int, dict]]:
+    """
+    '# Title' starts the topic, each '## ...' heading starts an entry
+
+    Entry lines starting with backslashes then '# ' or '## ' lose a backslash.
+    """
+    with zipfile.ZipFile(stream) as archive:
+        members = sorted(n for n in archive.namelist() if n.endswith(".md"))
+        for topic_number, name in enumerate(members, 1):
+            lines: list[str] = []
+            with archive.open(name) as member:
+                for line in io.TextIOWrapper(member, encoding="utf-8"):
+                    if line.startswith("## "):
+                        if "".join(lines).strip():
+                            yield topic_number, _markdown_entry(topic_number, lines)
+                        lines = []
+                    elif line.startswith("# ") and not lines:
+                        yield topic_number, {
+                            "type": "topic",
+                            "id": topic_number,
+                            "text": line[2:].strip(),
+                        }
+                    else:
+                        lines.append(ESCAPED_HEADING.sub(r"\1", line))
+                if "".join(lines).strip():
+                    yield topic_number, _markdown_entry(topic_number, lines)
+
+
+def _markdown_entry(topic_number: int, lines: list[str]) -> dict:
+    return {"type": "entry", "topic": topic_number, "text": "".join(lines).strip()}
+
+
+def read_records(stream: IO[bytes], fmt: str) -> Iterator[tuple[int, dict]]:
+    """Parse an export file incrementally"""
+    return {"jsonl": _read_jsonl, "csv": _read_csv, "md": _read_markdown_zip}[fmt](
+        stream
+    )
+
+
+class NotesImporter:
+    """Validate and batch-insert records for one user"""
+
+    # the form field rules (required, max_length, ...)
+    topic_text = TopicForm.base_fields["text"]
+    entry_text = EntryForm.base_fields["text"]
+
+    def __init__(self, user_id: int, batch_size: int = BATCH_SIZE) -> None:
+        self.user_id = user_id
+        self.batch_size = batch_size
+        # source topic id -> new Topic id, and the topics not inserted yet
+        self.topic_ids: dict[str, int] = {}
+        self.pending_topics: dict[str, Topic] = {}
+        self.pending_entries: list[Entry] = []
+        self.result = ImportResult()
+
+    def run(self, records: Iterator[tuple[int, dict]]) -> ImportResult:
+        start = time.perf_counter()
+        try:
+            for number, record in records:
+                self.add(number, record)
+        except (UnicodeDecodeError, zipfile.BadZipFile, csv.Error) as exc:
+            self.error("file", f"unreadable ({exc})")
+        self.flush_topics()
+        self.flush_entries()
+        if self.result.topics or self.result.entries:
+            # bulk_create() sends no signals
+            invalidate_user_topics(self.user_id)
+        self.result.seconds = time.perf_counter() - start
+        return self.result
+
+    def error(self, where: int | str, message: str) -> None:
+        self.result.skipped += 1
+        if len(self.result.errors) < MAX_REPORTED_ERRORS:
+            self.result.errors.append(f"row {where}: {message}")
+
+    def add(self, number: int, record: dict) -> None:
+        kind = record.get("type")
+        try:
+            if kind == "topic":
+                text = self.topic_text.clean(record.get("text"))
+                source_id = str(record.get("id", ""))
+                if (
+                    not source_id
+                    or source_id in self.topic_ids
+                    or source_id in self.pending_topics
+                ):
+                    raise ValidationError("missing or duplicate topic id")
+                self.pending_topics[source_id] = Topic(text=text, owner_id=self.user_id)
+                if len(self.pending_topics) >= self.batch_size:
+                    self.flush_topics()
+            elif kind == "entry":
+                text = self.entry_text.clean(record.get("text"))
+                topic_id = self.resolve_topic(str(record.get("topic", "")))
+                self.pending_entries.append(Entry(topic_id=topic_id, text=text))
+                if len(self.pending_entries) >= self.batch_size:
+                    self.flush_entries()
+            else:
+                raise ValidationError("unknown record type")
+        except ValidationError as exc:
+            self.error(number, "; ".join(exc.messages))
+
+    def resolve_topic(self, source_id: str) -> int:
+        if source_id not in self.topic_ids and self.pending_topics:
+            self.flush_topics()
+        if source_id not in self.topic_ids:
+            raise ValidationError("unknown topic")
+        return self.topic_ids[source_id]
+
+    def flush_topics(self) -> None:
+        if not self.pending_topics:
+            return
+        with transaction.atomic():
+            created = Topic.objects.bulk_create(self.pending_topics.values())
+        for source_id, topic in zip(self.pending_topics, created):
+            self.topic_ids[source_id] = topic.id
+        self.result.topics += len(created)
+        self.pending_topics = {}
+
+    def flush_entries(self) -> None:
+        if not self.pending_entries:
+            return
+        with transaction.atomic():
+            Entry.objects.bulk_create(self.pending_entries)
+        self.result.entries += len(self.pending_entries)
+        self.pending_entries = []
+
+
+def import_notes(
+    user_id: int, stream: IO[bytes], fmt: str, batch_size: int = BATCH_SIZE
+) -> ImportResult:
+    """
+    Import an export file into the user's notes
+
+    Args:
+        user_id (int): the new topics' owner
+        stream (IO[bytes]): the file, opened in binary mode
+        fmt (str): one of FORMATS
+        batch_size (int): rows per INSERT/transaction
+
+    Returns:
+        ImportResult: counts, skipped rows with reasons, timing
+    """
+    return NotesImporter(user_id, batch_size).run(read_records(stream, fmt))
@@ -0,0 +1,266 @@
+# In-process load benchmark for the notes views and the token endpoint
+#   <project_root>$ python manage.py bench --seed --users 10 --topics 10 --entries 100
+#   <project_root>$ python manage.py bench --requests 500 --concurrency 8 > run.json
+# Many slow clients, threads vs. the async views on the event loop:
+#   <project_root>$ python manage.py bench --concurrency 200 --think-ms 50
+#   <project_root>$ ASYNC_VIEWS=True python manage.py bench --async \
+#       --concurrency 200 --think-ms 50
+#
+# Requests go through the Django test client (the full middleware stack, no
+#   network), so runs are comparable across changes: diff the JSON reports.
+#   With --async they go through the ASGI handler (AsyncClient), one coroutine
+#   per client; queries are then not counted (they run in worker threads).
+# WARNING: --seed runs the seed command, which wipes all topics and entries.
+#
+
+import asyncio
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from config.reports import write_report
+from notes.models import Topic
+from .seed import SEED_PASSWORD, SEED_USER_PREFIX
+
+
+class QueryCounter:
+    """connection.execute_wrapper counting the queries of one request"""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, execute: Callable, *args: Any) -> Any:
+        self.count += 1
+        return execute(*args)
+
+
+def summarize(samples: list[tuple[float, int | None, int]], wall: float) -> dict:
+    """Latency percentiles, queries per request and throughput for a scenario"""
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    # not counted under ASGI (None)
+    queries = [sample[1] for sample in samples if sample[1] is not None]
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if sample[2] >= 400),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "queries_per_request": (
+            round(statistics.fmean(queries), 2) if queries else None
+        ),
+        "throughput_rps": round(len(samples) / wall, 1) if wall else 0.0,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark the notes views and /api/token/, report JSON"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # the seed users as (id, username), and their topic ids by user id
+        self.users: list[tuple[int, str]] = []
+        self.usernames: dict[int, str] = {}
+        self.topics: dict[int, list[int]] = {}
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--seed",
+            action="store_true",
+            help="Reseed first (wipes all topics and entries)",
+        )
+        parser.add_argument("--users", type=int, default=5, help="Seed users")
+        parser.add_argument("--topics", type=int, default=5, help="Topics per user")
+        parser.add_argument(
+            "--entries", type=int, default=100, help="Entries per topic"
+        )
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Requests per scenario"
+        )
+        parser.add_argument(
+            "--token-requests",
+            type=int,
+            default=20,
+            help="Requests for /api/token/ (password hashing is slow by design)",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=4, help="Concurrent client threads"
+        )
+        parser.add_argument(
+            "--think-ms",
+            type=float,
+            default=0,
+            help="Pause between a client's requests (simulates slow clients)",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Use the ASGI handler, one coroutine per client "
+            "(run with ASYNC_VIEWS=True to get the async views)",
+        )
+        parser.add_argument("--output", help="Also write the JSON report here")
+
+    def handle(self, *args: str, **options: Any) -> None:
+        if options["seed"]:
+            call_command(
+                "seed",
+                users=options["users"],
+                topics=options["topics"],
+                entries=options["entries"],
+                stdout=self.stderr,
+            )
+
+        self.users = list(
+            User.objects.filter(username__startswith=SEED_USER_PREFIX).values_list(
+                "id", "username"
+            )
+        )
+        if not self.users:
+            raise CommandError("No seed users found: run with --seed first.")
+        self.usernames = dict(self.users)
+        for topic_id, owner_id in Topic.objects.filter(
+            owner_id__in=[user_id for user_id, _ in self.users]
+        ).values_list("id", "owner_id"):
+            self.topics.setdefault(owner_id, []).append(topic_id)
+
+        requests, token_requests = options["requests"], options["token_requests"]
+        scenarios = {
+            "notes:index": (requests, lambda c, _: c.get(reverse("notes:index"))),
+            "notes:topics": (requests, lambda c, _: c.get(reverse("notes:topics"))),
+            "notes:topic": (requests, self.get_topic),
+            "api:token": (token_requests, self.post_token),
+        }
+
+        # the test client talks to 'testserver'
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        report: dict[str, Any] = {
+            "config": {
+                key: options[key]
+                for key in ("users", "topics", "entries", "concurrency", "think_ms")
+            },
+            "mode": "asgi" if options["use_async"] else "wsgi",
+            "async_views": settings.ASYNC_VIEWS,
+            "database": connection.vendor,
+            "scenarios": {},
+        }
+        # every simulated client shares one IP: lift the login rate limits
+        with override_settings(ALLOWED_HOSTS=hosts, RATELIMIT_ENABLED=False):
+            for name, (count, send) in scenarios.items():
+                self.stderr.write(f"{name}: {count} requests")
+                if options["use_async"]:
+                    result = asyncio.run(
+                        self.run_scenario_async(
+                            send, count, options["concurrency"], options["think_ms"]
+                        )
+                    )
+                else:
+                    result = self.run_scenario(
+                        send, count, options["concurrency"], options["think_ms"]
+                    )
+                report["scenarios"][name] = result
+
+        write_report(self, report, options["output"])
+
+    ##
+    # Scenario request functions: (client, logged in user id) -> response
+    #   (an awaitable response with an AsyncClient)
+    #
+    def get_topic(self, client: Client, user_id: int) -> Any:
+        topic_id = random.choice(self.topics.get(user_id) or [0])
+        return client.get(reverse("notes:topic", args=[topic_id]))
+
+    def post_token(self, client: Client, user_id: int) -> Any:
+        return client.post(
+            reverse("token_obtain_pair"),
+            {"username": self.usernames[user_id], "password": SEED_PASSWORD},
+        )
+
+    @staticmethod
+    def split(count: int, concurrency: int) -> list[int]:
+        """count requests shared out between concurrency clients"""
+        per_client = [count // concurrency] * concurrency
+        for i in range(count % concurrency):
+            per_client[i] += 1
+        return [n for n in per_client if n]
+
+    def run_scenario(
+        self, send: Callable, count: int, concurrency: int, think_ms: float
+    ) -> dict:
+        """Send count requests spread over concurrency client threads"""
+        samples: list[tuple[float, int | None, int]] = []
+        lock = threading.Lock()
+
+        def worker(requests: int) -> None:
+            user_id, _ = random.choice(self.users)
+            client = Client()
+            client.force_login(User.objects.get(pk=user_id))
+            local = []
+            try:
+                for _ in range(requests):
+                    counter = QueryCounter()
+                    start = time.perf_counter()
+                    with connection.execute_wrapper(counter):
+                        response = send(client, user_id)
+                    local.append(
+                        (
+                            time.perf_counter() - start,
+                            counter.count,
+                            response.status_code,
+                        )
+                    )
+                    time.sleep(think_ms / 1000)
+            finally:
+                # each thread has its own database connection
+                connection.close()
+            with lock:
+                samples.extend(local)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [
+                pool.submit(worker, n) for n in self.split(count, concurrency)
+            ]:
+                future.result()
+        return summarize(samples, time.perf_counter() - start)
+
+    async def run_scenario_async(
+        self, send: Callable, count: int, concurrency: int, think_ms: float
+    ) -> dict:
+        """Send count requests from concurrency coroutines on one event loop"""
+        samples: list[tuple[float, int | None, int]] = []
+
+        async def worker(requests: int) -> None:
+            user_id, _ = random.choice(self.users)
+            client = AsyncClient()
+            await client.aforce_login(await User.objects.aget(pk=user_id))
+            for _ in range(requests):
+                start = time.perf_counter()
+                # as in ASGIHandler: each request gets its own sync thread
+                async with ThreadSensitiveContext():
+                    response = await send(client, user_id)
+                samples.append(
+                    (time.perf_counter() - start, None, response.status_code)
+                )
+                await asyncio.sleep(think_ms / 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in self.split(count, concurrency)))
+        return summarize(samples, time.perf_counter() - start)
@@ -0,0 +1,108 @@
+# pylint: disable=W0613
+#
+# Time and memory of deleting a topic with many entries (see notes/deletion.py)
+#   <project_root>$ python manage.py bench_delete
+#   <project_root>$ python manage.py bench_delete --entries 100000 --output delete.json
+#
+# Creates a throwaway user's topic with --entries entries and deletes it, once
+#   per setup, reporting the wall time and the peak Python memory (tracemalloc,
+#   measured in a separate run so tracing doesn't skew the times):
+#     collector:   topic.delete() with Django's CASCADE (the entries loaded,
+#                  with a post_delete signal each), as before DB_CASCADE
+#     db_cascade:  topic.delete() with the database's ON DELETE CASCADE
+#                  (PostgreSQL only)
+#     trash:       the delete request with TOPIC_SOFT_DELETE (trash_ms) and the
+#                  purge_trash batches that follow it (purge_ms)
+# Run it against a copy of production-like data, not the live database.
+#
+
+import time
+import tracemalloc
+from typing import Any, Callable
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from django.test import override_settings
+
+from config.reports import write_report
+from notes.deletion import delete_topic, purge_trash
+from notes.models import Topic, Entry, database_cascades
+
+USERNAME = "bench-delete"
+
+
+def collector(topic: Topic) -> dict[str, float]:
+    with mock.patch("notes.models.database_cascades", return_value=False):
+        return {"delete_ms": timed(topic.delete)}
+
+
+def db_cascade(topic: Topic) -> dict[str, float]:
+    return {"delete_ms": timed(topic.delete)}
+
+
+def trash(topic: Topic) -> dict[str, float]:
+    with override_settings(TOPIC_SOFT_DELETE=True):
+        trash_ms = timed(lambda: delete_topic(topic))
+    # the benchmark user's trash only, not the real users'
+    purge_ms = timed(lambda: purge_trash(owner_id=topic.owner_id))
+    return {"trash_ms": trash_ms, "purge_ms": purge_ms}
+
+
+def timed(function: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    function()
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+class Command(BaseCommand):
+    help = "Benchmark deleting a topic with many entries"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--entries", type=int, default=100_000, help="Entries in the topic"
+        )
+        parser.add_argument("--output", help="Also write the JSON report here")
+
+    def build(self, user: User, entries: int) -> Topic:
+        """A topic with `entries` entries"""
+        topic: Topic = Topic.objects.create(text="Deleted in the benchmark", owner=user)
+        for start in range(0, entries, 5000):
+            Entry.objects.bulk_create(
+                Entry(topic=topic, text=f"Entry number {number}.")
+                for number in range(start, min(start + 5000, entries))
+            )
+        return topic
+
+    def handle(self, *args: str, **options: Any) -> None:
+        setups: dict[str, Callable[[Topic], dict[str, float]]] = {
+            "collector": collector
+        }
+        if database_cascades(connection.alias):
+            setups["db_cascade"] = db_cascade
+        setups["trash"] = trash
+
+        User.objects.filter(username=USERNAME).delete()
+        user = User.objects.create_user(username=USERNAME)
+        report: dict[str, Any] = {
+            "database": connection.vendor,
+            "entries": options["entries"],
+            "setups": {},
+        }
+        try:
+            for name, setup in setups.items():
+                self.stderr.write(name)
+                result = setup(self.build(user, options["entries"]))
+                topic = self.build(user, options["entries"])
+                tracemalloc.start()
+                setup(topic)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                result["peak_memory_mb"] = round(peak / 1024 / 1024, 1)
+                report["setups"][name] = result
+        finally:
+            # empty by now: every setup deleted its topics
+            user.delete()
+
+        write_report(self, report, options["output"])
@@ -0,0 +1,132 @@
+# pylint: disable=W0613
+#
+# Render time of a topic page with many entries, before/after template caching
+#   <project_root>$ python manage.py bench_render
+#   <project_root>$ python manage.py bench_render --entries 1000 --repeat 50 \
+#       --output render.json
+#
+# Renders notes/topic.html with --entries in-memory entries (no database) in
+#   three setups:
+#     uncached:         templates parsed on every render, every card rendered
+#     cached_loader:    templates compiled once, every card rendered
+#     cached_fragments: templates compiled once, cards from the fragment cache
+#   (the last is the production setup once the cards have been seen)
+#
+
+import statistics
+import time
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandParser
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from config.reports import write_report
+from notes.models import Topic, Entry
+from notes.pagination import KeysetPage
+from notes.rendering import render_html
+
+PARAGRAPH = (
+    "Ran the usual loop, then the stretches. Knee felt fine after the first "
+    "kilometre; the new shoes help. Remember to log the pace next time."
+)
+
+
+def page_context(entries: int) -> dict:
+    """A topic page with `entries` entries, built in memory"""
+    now = timezone.now()
+    topic = Topic(id=1, text="Running log", date_added=now, date_modified=now)
+    page_entries = []
+    for number in range(1, entries + 1):
+        text = f"{PARAGRAPH}\n\n{PARAGRAPH}\nDay {number}."
+        page_entries.append(
+            Entry(
+                id=number,
+                topic=topic,
+                text=text,
+                # as stored on save
+                text_html=render_html(text),
+                date_added=now - timedelta(minutes=number),
+                date_modified=now - timedelta(minutes=number),
+            )
+        )
+    return {"topic": topic, "entries": page_entries, "page": KeysetPage(page_entries)}
+
+
+def uncached_templates() -> list[dict]:
+    """settings.TEMPLATES with the cached loader taken out"""
+    templates = [
+        dict(engine, OPTIONS=dict(engine["OPTIONS"])) for engine in settings.TEMPLATES
+    ]
+    for engine in templates:
+        loaders = engine["OPTIONS"].get("loaders", [])
+        engine["OPTIONS"]["loaders"] = [
+            loader
+            for wrapped in loaders
+            for loader in (wrapped[1] if isinstance(wrapped, tuple) else [wrapped])
+        ]
+    return templates
+
+
+class Command(BaseCommand):
+    help = "Benchmark rendering a large topic page, with and without caching"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--entries", type=int, default=1000, help="Entries on the page"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Timed renders per setup"
+        )
+        parser.add_argument("--output", help="Also write the JSON report here")
+
+    def handle(self, *args: str, **options: Any) -> None:
+        context = page_context(options["entries"])
+        request = RequestFactory().get("/topics/1/")
+        request.user = User(id=1, username="bench")
+
+        no_fragments = {
+            **settings.CACHES,
+            "template_fragments": {
+                "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+            },
+        }
+        setups = {
+            "uncached": override_settings(
+                TEMPLATES=uncached_templates(), CACHES=no_fragments
+            ),
+            "cached_loader": override_settings(CACHES=no_fragments),
+            "cached_fragments": override_settings(),
+        }
+
+        report: dict[str, Any] = {
+            "entries": options["entries"],
+            "repeat": options["repeat"],
+            "setups": {},
+        }
+        for name, setup in setups.items():
+            self.stderr.write(name)
+            with setup:
+                caches["template_fragments"].clear()
+                # warm up: compile the templates (if cached), fill the fragments
+                render_to_string("notes/topic.html", context, request)
+                timings = []
+                for _ in range(options["repeat"]):
+                    start = time.perf_counter()
+                    render_to_string("notes/topic.html", context, request)
+                    timings.append((time.perf_counter() - start) * 1000)
+            report["setups"][name] = {
+                "mean_ms": round(statistics.fmean(timings), 3),
+                "median_ms": round(statistics.median(timings), 3),
+                "min_ms": round(min(timings), 3),
+            }
+        before = report["setups"]["uncached"]["median_ms"]
+        after = report["setups"]["cached_fragments"]["median_ms"]
+        report["speedup"] = round(before / after, 1) if after else None
+
+        write_report(self, report, options["output"])
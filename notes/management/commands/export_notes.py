@@ -0,0 +1,49 @@
+# pylint: disable=W0613
+#
+# Export one user's notes (streamed, constant memory)
+#   <project_root>$ python manage.py export_notes testuser --format jsonl > notes.jsonl
+#   <project_root>$ python manage.py export_notes testuser --format md -o notes.zip
+#
+
+from typing import IO, Any
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from notes.export import FORMATS, export_stream
+
+
+class Command(BaseCommand):
+    help = "Export a user's topics and entries as jsonl, csv or md (zip)"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("username", type=str, help="Whose notes to export")
+        parser.add_argument(
+            "--format", choices=sorted(FORMATS), default="jsonl", dest="fmt"
+        )
+        parser.add_argument(
+            "-o", "--output", help="Output file (default: stdout, not for md)"
+        )
+
+    def handle(self, *args: str, **options: Any) -> None:
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist as exc:
+            raise CommandError(f"User {options['username']} does not exist.") from exc
+
+        fmt = options["fmt"]
+        if fmt == "md" and not options["output"]:
+            raise CommandError("The md format is a zip archive: use --output.")
+
+        if options["output"]:
+            out: IO[Any]
+            if fmt == "md":
+                out = open(options["output"], "wb")
+            else:
+                out = open(options["output"], "w", encoding="utf-8", newline="")
+            with out:
+                for chunk in export_stream(user.id, fmt):
+                    out.write(chunk)
+        else:
+            for chunk in export_stream(user.id, fmt):
+                self.stdout.write(chunk, ending="")
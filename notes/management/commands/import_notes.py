@@ -0,0 +1,56 @@
+# pylint: disable=W0613
+#
+# Import an export file into a user's notes (batched inserts)
+#   <project_root>$ python manage.py import_notes testuser notes.jsonl
+#   <project_root>$ python manage.py import_notes testuser notes.zip --batch-size 10000
+#
+
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from notes.importer import BATCH_SIZE, FORMATS, detect_format, import_notes
+
+
+class Command(BaseCommand):
+    help = "Import topics and entries from a jsonl, csv or md (zip) export"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("username", type=str, help="Who will own the notes")
+        parser.add_argument("path", type=str, help="The export file")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            dest="fmt",
+            help="Default: from the file extension",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=BATCH_SIZE, help="Rows per INSERT"
+        )
+
+    def handle(self, *args: str, **options: Any) -> None:
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist as exc:
+            raise CommandError(f"User {options['username']} does not exist.") from exc
+
+        fmt = options["fmt"] or detect_format(options["path"])
+        if fmt is None:
+            raise CommandError("Unknown file type: use --format.")
+
+        try:
+            with open(options["path"], "rb") as source:
+                result = import_notes(user.id, source, fmt, options["batch_size"])
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+
+        for error in result.errors:
+            self.stderr.write(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"----- IMPORTED {result.topics:,} topics, {result.entries:,} entries"
+                f" ({result.rows_per_second:,.0f} rows/s in {result.seconds:.1f}s),"
+                f" skipped {result.skipped:,} -----"
+            )
+        )
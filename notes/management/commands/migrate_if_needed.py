@@ -0,0 +1,45 @@
+# pylint: disable=W0613
+#
+# Run migrate only when there is something to apply (used by render.yaml)
+#   <project_root>$ python manage.py migrate_if_needed
+#
+# A plain "migrate --noinput" on every boot costs seconds even when the
+#   database is current: the system checks (which import every URLconf and
+#   view) and the post_migrate handlers (a contenttypes/permissions pass over
+#   every app). Here the migration files are compared with the
+#   django_migrations table (one query, see config/schema.py) first, and
+#   migrate only runs when a migration is unapplied.
+#
+
+import time
+from typing import Any
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import DEFAULT_DB_ALIAS
+
+from config.schema import unapplied_migrations
+
+
+class Command(BaseCommand):
+    help = "Apply migrations, skipping migrate entirely if there are none"
+
+    # the checks are what makes a no-op migrate slow; migrate runs its own
+    requires_system_checks: list = []
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--database", default=DEFAULT_DB_ALIAS, help="Database alias"
+        )
+
+    def handle(self, *args: str, **options: Any) -> None:
+        start = time.perf_counter()
+        pending = unapplied_migrations(options["database"])
+        if not pending:
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"No migrations to apply ({elapsed:.2f}s).")
+            return
+        self.stdout.write(f"Applying {len(pending)}: {', '.join(pending)}")
+        call_command(
+            "migrate", database=options["database"], interactive=False, verbosity=1
+        )
@@ -0,0 +1,44 @@
+# pylint: disable=W0613
+#
+# Delete the trashed topics and their entries (see notes/deletion.py)
+#   <project_root>$ python manage.py purge_trash
+#   <project_root>$ python manage.py purge_trash --batch-size 2000 --pause 0.1
+#
+# Deleting a topic (with TOPIC_SOFT_DELETE=True) only hides it; this removes
+#   its entries --batch-size rows per DELETE, each in its own transaction,
+#   optionally pausing in between, then the topic. Safe to stop and rerun:
+#   whatever is left stays trashed for the next run (render.yaml schedules it).
+#
+
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from notes.deletion import purge_trash
+
+
+class Command(BaseCommand):
+    help = "Purge trashed topics and their entries in batches"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size", type=int, default=5000, help="Entries per DELETE"
+        )
+        parser.add_argument(
+            "--pause", type=float, default=0.0, help="Seconds between batches"
+        )
+
+    def handle(self, *args: str, **options: Any) -> None:
+        started = time.perf_counter()
+        topics, entries = purge_trash(
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            progress=lambda topics, entries: self.stderr.write(
+                f"topics: {topics:,} entries: {entries:,}"
+            ),
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Purged {topics:,} topics and {entries:,} entries in {elapsed:.1f}s."
+        )
@@ -0,0 +1,62 @@
+# pylint: disable=W0613
+#
+# Recount Topic.entry_count/last_entry_at from the entries (see notes/models.py)
+#   <project_root>$ python manage.py reconcile_counters
+#   <project_root>$ python manage.py reconcile_counters --username testuser
+#
+# Only needed after entries were written behind the app's back (raw SQL, a
+#   restore): the app keeps the counters in step itself. Topics are checked in
+#   id order, one batch per transaction, and only wrong ones are rewritten.
+#
+
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from notes.cache import invalidate_user_topics
+from notes.models import reconcile_counters
+from notes.models import Topic
+
+
+class Command(BaseCommand):
+    help = "Repair the per-topic entry counters"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--username", help="Only this user's topics")
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Topics per transaction"
+        )
+
+    def handle(self, *args: str, **options: Any) -> None:
+        topics = Topic.objects.order_by("id")
+        if options["username"]:
+            try:
+                user = User.objects.get(username=options["username"])
+            except User.DoesNotExist as exc:
+                raise CommandError(
+                    f"User {options['username']} does not exist."
+                ) from exc
+            topics = topics.filter(owner=user)
+
+        checked = fixed = last_id = 0
+        while True:
+            batch = list(
+                topics.filter(id__gt=last_id).values_list("id", "owner_id")[
+                    : options["batch_size"]
+                ]
+            )
+            if not batch:
+                break
+            with transaction.atomic():
+                wrong = reconcile_counters(topic_id for topic_id, _ in batch)
+            if wrong:
+                # the cached topics lists show the counters
+                for owner_id in {owner_id for _, owner_id in batch}:
+                    invalidate_user_topics(owner_id)
+            checked += len(batch)
+            fixed += wrong
+            last_id = batch[-1][0]
+
+        self.stdout.write(f"Checked {checked:,} topics, fixed {fixed:,}.")
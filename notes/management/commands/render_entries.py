@@ -0,0 +1,59 @@
+# pylint: disable=W0613
+#
+# Fill in Entry.text_html for rows saved before it existed (see notes/rendering.py)
+#   <project_root>$ python manage.py render_entries
+# After a change to render_html(), re-render every entry:
+#   <project_root>$ python manage.py render_entries --all
+#
+# Walks the table in id order, one bulk UPDATE (and transaction) per batch,
+#   so it can run against a live site and be stopped and restarted.
+#   date_modified is left alone: the text didn't change, so sync clients have
+#   nothing new to fetch.
+#
+
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from notes.models import Entry
+from notes.rendering import render_html
+
+
+class Command(BaseCommand):
+    help = "Render Entry.text_html for existing entries"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-render every entry, not only those without HTML",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=2000, help="Rows per UPDATE"
+        )
+
+    def handle(self, *args: str, **options: Any) -> None:
+        entries = Entry.objects.order_by("id").only("id", "text")
+        if not options["all"]:
+            entries = entries.filter(text_html="")
+
+        started = time.perf_counter()
+        rendered, last_id = 0, 0
+        while True:
+            batch = list(entries.filter(id__gt=last_id)[: options["batch_size"]])
+            if not batch:
+                break
+            for entry in batch:
+                entry.text_html = render_html(entry.text)
+            with transaction.atomic():
+                # the queryset's bulk_update() only renders when "text" changes
+                Entry.objects.bulk_update(batch, ["text_html"])
+            rendered += len(batch)
+            last_id = batch[-1].id
+            self.stderr.write(f"entries: {rendered:,}")
+
+        # (the cached entry cards are keyed by the HTML: no need to clear them)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"Rendered {rendered:,} entries in {elapsed:.1f}s.")
@@ -2,23 +2,108 @@
 
 # This script must be located in: <project_root>/<app_dir>/management/commands/
 # Run it: <project_root>$ python manage.py seed
+# Larger data volumes (e.g. for the bench command):
+#   <project_root>$ python manage.py seed --users 10 --topics 20 --entries 50
+# Production-sized volumes, added to what is already there, using COPY on
+#   PostgreSQL:
+#   <project_root>$ python manage.py seed --append --users 5000 --topics 20 \
+#       --entries 20 --copy
+# The generated text is pseudo-random but deterministic for a given --random-seed
 
-from django.core.management.base import BaseCommand
+import csv
+import io
+import random
+import time
+from itertools import batched
+from typing import Any, Iterable
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.core.management.color import no_style
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+from notes.models import reconcile_counters
 from notes.models import Topic, Entry
+from notes.rendering import render_html
+
+# Accounts created by the volume options: seeduser0000001, seeduser0000002, ...
+SEED_USER_PREFIX = "seeduser"
+SEED_PASSWORD = "testpass123"
+
+# Tables the raw SQL below writes to (_meta is Django's documented Model API)
+# pylint: disable-next=protected-access
+ENTRY_TABLE, TOPIC_TABLE = Entry._meta.db_table, Topic._meta.db_table
+
+# Vocabulary for the generated notes
+WORDS = (
+    "virtual environment package dependency logging module exception handler "
+    "context manager test fixture database query index migration template view "
+    "cache session token request response deploy server worker queue retry "
+    "timeout config setting debug trace profile benchmark latency throughput "
+    "refactor commit branch merge review release python django postgres routine "
+    "habit journal note idea plan goal morning evening weekly daily progress"
+).split()
+
+
+def fake_text(rng: random.Random, low: int, high: int) -> str:
+    """A pseudo-random 'sentence' of low to high words"""
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize() + "."
 
 
 class Command(BaseCommand):
     help = "Reset and seed the database with test data"
 
-    def handle(self, *args: str, **kwargs: str) -> None:
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # seed_volume()'s progress: when it started and the rows created so far
+        self.started = 0.0
+        self.counts = {"users": 0, "topics": 0, "entries": 0}
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--users", type=int, default=0, help="Extra seed users to create"
+        )
+        parser.add_argument(
+            "--topics", type=int, default=0, help="Topics per seed user"
+        )
+        parser.add_argument("--entries", type=int, default=0, help="Entries per topic")
+        parser.add_argument(
+            "--append",
+            action="store_true",
+            help="Add to the existing data instead of wiping topics and entries",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000, help="Rows per INSERT/COPY batch"
+        )
+        parser.add_argument(
+            "--random-seed", type=int, default=42, help="Seed for the generated text"
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Load entries with COPY (PostgreSQL only)",
+        )
+
+    def handle(self, *args: str, **kwargs: Any) -> None:
         test_user = "testuser"
-        test_pwd = "testpass123"
+        test_pwd = SEED_PASSWORD
+        if kwargs["copy"] and connection.vendor != "postgresql":
+            raise CommandError("--copy requires PostgreSQL.")
+
+        if kwargs["append"]:
+            if kwargs["users"]:
+                self.seed_volume(**kwargs)
+            self.stdout.write(self.style.SUCCESS("----- DATABASE SYNCED -----"))
+            return
 
-        # Clear existing data
-        Entry.objects.all().delete()
-        Topic.objects.all().delete()
+        # Clear existing data (a TRUNCATE/DELETE per table, without loading
+        #   every row into memory the way QuerySet.delete() would)
+        connection.ops.execute_sql_flush(
+            connection.ops.sql_flush(no_style(), [ENTRY_TABLE, TOPIC_TABLE])
+        )
         User.objects.filter(username=test_user).delete()
+        User.objects.filter(username__startswith=SEED_USER_PREFIX).delete()
 
         # Create test user
         user = User.objects.create_user(username=test_user, password=test_pwd)
@@ -53,4 +138,107 @@ class Command(BaseCommand):
             "'finally' or context managers.",
         )
 
+        if kwargs["users"]:
+            self.seed_volume(**kwargs)
+
         self.stdout.write(self.style.SUCCESS("----- DATABASE SYNCED -----"))
+
+    def seed_volume(self, **options: Any) -> None:
+        """
+        Create users x topics x entries in batches
+
+        Works through the users a batch at a time and streams their entries,
+        so memory stays flat however many rows are requested.
+        """
+        users, topics, entries = options["users"], options["topics"], options["entries"]
+        batch_size = options["batch_size"]
+        rng = random.Random(options["random_seed"])
+        self.started = time.perf_counter()
+        self.counts = {"users": 0, "topics": 0, "entries": 0}
+        total_entries = users * topics * entries
+
+        # Number new users after any left by a previous --append run
+        last = (
+            User.objects.filter(username__startswith=SEED_USER_PREFIX)
+            .order_by("-username")
+            .values_list("username", flat=True)
+            .first()
+        )
+        first = int(last[len(SEED_USER_PREFIX) :]) + 1 if last else 1
+        # Hash once: every seed user shares the same password
+        password = make_password(SEED_PASSWORD)
+
+        for numbers in batched(range(first, first + users), batch_size):
+            with transaction.atomic():
+                seed_users = User.objects.bulk_create(
+                    [
+                        User(username=f"{SEED_USER_PREFIX}{n:07d}", password=password)
+                        for n in numbers
+                    ]
+                )
+                seed_topics = Topic.objects.bulk_create(
+                    [
+                        Topic(text=fake_text(rng, 2, 6), owner=seed_user)
+                        for seed_user in seed_users
+                        for _ in range(topics)
+                    ],
+                    batch_size=batch_size,
+                )
+            self.counts["users"] += len(seed_users)
+            self.counts["topics"] += len(seed_topics)
+
+            rows = (
+                (topic.id, fake_text(rng, 8, 60))
+                for topic in seed_topics
+                for _ in range(entries)
+            )
+            for batch in batched(rows, batch_size):
+                if options["copy"]:
+                    self.copy_entries(batch)
+                else:
+                    Entry.objects.bulk_create(
+                        [
+                            Entry(topic_id=topic_id, text=text)
+                            for topic_id, text in batch
+                        ]
+                    )
+                self.counts["entries"] += len(batch)
+                self.progress(total_entries)
+            if options["copy"]:
+                # COPY bypasses Entry.objects.bulk_create(): count them here
+                reconcile_counters(topic.id for topic in seed_topics)
+
+        elapsed = time.perf_counter() - self.started
+        report = ", ".join(
+            f"{count:,} {name} ({count / elapsed:,.0f}/s)"
+            for name, count in self.counts.items()
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"----- SEEDED {report} in {elapsed:.1f}s -----")
+        )
+
+    def copy_entries(self, batch: Iterable[tuple[int, str]]) -> None:
+        """Load a batch of (topic_id, text) rows with PostgreSQL COPY"""
+        now = timezone.now()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for topic_id, text in batch:
+            writer.writerow([topic_id, text, render_html(text), now, now])
+        buffer.seek(0)
+        sql = (
+            f"COPY {ENTRY_TABLE}"
+            " (topic_id, text, text_html, date_added, date_modified)"
+            " FROM STDIN WITH (FORMAT csv)"
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, "copy_expert"):  # psycopg2
+                raw.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def progress(self, total: int) -> None:
+        done = self.counts["entries"]
+        rate = done / (time.perf_counter() - self.started)
+        self.stderr.write(f"entries: {done:,}/{total:,} ({rate:,.0f} rows/s)")
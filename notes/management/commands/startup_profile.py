@@ -0,0 +1,151 @@
+# pylint: disable=W0613
+#
+# Where a cold start spends its time: settings, each installed app, the WSGI
+#   handler (middleware) and the URLconf (views), plus the slowest imports
+#   <project_root>$ python manage.py startup_profile
+#   <project_root>$ python manage.py startup_profile --top 30 --output startup.json
+#
+# Runs a fresh interpreter (this process has everything imported already)
+#   that times each module as it is executed, whichever way it is imported
+#   (-X importtime misses the importlib.import_module() calls Django loads
+#   settings, apps and models with), and reports in milliseconds:
+#     phases: wall time of each startup step, in order
+#     apps:   time spent in each installed app's own modules (its package,
+#             models, admin, ...; not the libraries they pull in)
+#     top:    the slowest imports made directly by a startup step, including
+#             everything they import
+#
+
+import json
+import os
+import subprocess
+import sys
+from typing import Any
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from config.reports import write_report
+
+# What the child interpreter runs: a meta path finder wrapping every loader
+#   with a timer, then the steps a worker goes through when it boots
+STARTUP = """
+import json, sys, time
+
+class TimedLoader:
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            modules[module.__name__] = (len(stack), total - children, total)
+
+class Timer:
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = TimedLoader(spec.loader)
+                return spec
+        return None
+
+stack, modules, marks = [], {}, {}
+sys.meta_path.insert(0, Timer())
+start = time.perf_counter()
+
+def mark(name):
+    marks[name] = (time.perf_counter() - start) * 1000
+
+import django
+mark("django")
+from django.conf import settings
+settings.INSTALLED_APPS
+mark("settings")
+django.setup()
+mark("apps")
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+mark("wsgi_handler")
+from django.urls import get_resolver
+get_resolver().url_patterns
+mark("urlconf")
+print(json.dumps({"marks": marks, "modules": modules}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Profile the import time of a cold start (settings, apps, urls)"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--top", type=int, default=15, help="Slowest top-level imports to list"
+        )
+        parser.add_argument("--output", help="Also write the JSON report here")
+
+    def handle(self, *args: str, **options: Any) -> None:
+        result = subprocess.run(
+            [sys.executable, "-c", STARTUP],
+            capture_output=True,
+            text=True,
+            env=os.environ.copy(),
+            check=False,
+        )
+        if result.returncode:
+            raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        # module: (depth, self seconds, cumulative seconds)
+        modules = timings["modules"]
+
+        # milliseconds of each step, from the cumulative marks
+        phases, previous = {}, 0.0
+        for name, at in timings["marks"].items():
+            phases[name] = round(at - previous, 1)
+            previous = at
+
+        # self time of each app's own modules
+        packages = [config.name for config in apps.get_app_configs()]
+        app_seconds = dict.fromkeys(packages, 0.0)
+        for module, (_, self_time, _) in modules.items():
+            for package in packages:
+                if module == package or module.startswith(package + "."):
+                    app_seconds[package] += self_time
+                    break
+
+        top = sorted(
+            (item for item in modules.items() if item[1][0] == 0),
+            key=lambda item: -item[1][2],
+        )[: options["top"]]
+        report = {
+            "python": sys.version.split()[0],
+            "total_ms": round(previous, 1),
+            "phases_ms": phases,
+            "apps_ms": {
+                package: round(seconds * 1000, 1)
+                for package, seconds in sorted(
+                    app_seconds.items(), key=lambda item: -item[1]
+                )
+            },
+            "top_imports_ms": {
+                module: round(cumulative * 1000, 1)
+                for module, (_, _, cumulative) in top
+            },
+        }
+
+        write_report(self, report, options["output"])
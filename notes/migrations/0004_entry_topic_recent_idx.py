@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0003_topic_owner"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(
+                fields=["topic", "-date_added", "-id"],
+                name="notes_entry_topic_recent_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:27
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# PostgreSQL only: GIN indexes over the stored vectors, plus triggers that
+#   keep them current on every INSERT/UPDATE (including bulk operations).
+#   The SQLite fallback is installed by notes.search.install_sqlite_fts
+TABLES = ["notes_topic", "notes_entry"]
+
+FORWARD_SQL = """
+CREATE FUNCTION {table}_search_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := to_tsvector('english', coalesce(NEW.text, ''));
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER {table}_search_trg BEFORE INSERT OR UPDATE OF text ON {table}
+    FOR EACH ROW EXECUTE FUNCTION {table}_search_update();
+UPDATE {table} SET search_vector = to_tsvector('english', coalesce(text, ''));
+CREATE INDEX {table}_search_idx ON {table} USING gin (search_vector);
+"""
+
+REVERSE_SQL = """
+DROP INDEX IF EXISTS {table}_search_idx;
+DROP TRIGGER IF EXISTS {table}_search_trg ON {table};
+DROP FUNCTION IF EXISTS {table}_search_update();
+"""
+
+
+def add_search_triggers(_apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        schema_editor.execute(FORWARD_SQL.format(table=table))
+
+
+def remove_search_triggers(_apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        schema_editor.execute(REVERSE_SQL.format(table=table))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0005_sync_tracking"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entry",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(add_search_triggers, remove_search_triggers),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0006_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entry",
+            name="text_html",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+    ]
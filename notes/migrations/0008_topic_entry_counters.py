@@ -0,0 +1,61 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_entries(apps, _schema_editor):
+    """Start the counters from the existing entries (one UPDATE)"""
+    Topic = apps.get_model("notes", "Topic")
+    Entry = apps.get_model("notes", "Entry")
+    entries = Entry.objects.filter(topic_id=OuterRef("id")).order_by()
+    Topic.objects.update(
+        entry_count=Coalesce(
+            Subquery(entries.values("topic_id").annotate(n=Count("id")).values("n")),
+            Value(0),
+        ),
+        last_entry_at=Subquery(
+            entries.order_by("-date_added", "-id").values("date_added")[:1]
+        ),
+    )
+
+
+# Serves the topics page sorted by recent activity, unused topics last: SQLite
+#   sorts NULLs as the smallest value, so a plain DESC index already does that,
+#   PostgreSQL needs NULLS LAST spelled out
+ACTIVITY_INDEX = (
+    "CREATE INDEX notes_topic_owner_activity_idx ON notes_topic"
+    " (owner_id, last_entry_at DESC{nulls}, id DESC)"
+)
+
+
+def add_activity_index(_apps, schema_editor):
+    nulls = " NULLS LAST" if schema_editor.connection.vendor == "postgresql" else ""
+    schema_editor.execute(ACTIVITY_INDEX.format(nulls=nulls))
+
+
+def remove_activity_index(_apps, schema_editor):
+    schema_editor.execute("DROP INDEX IF EXISTS notes_topic_owner_activity_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0007_entry_text_html"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="topic",
+            name="entry_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="last_entry_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(add_activity_index, remove_activity_index),
+        migrations.RunPython(count_entries, migrations.RunPython.noop),
+    ]
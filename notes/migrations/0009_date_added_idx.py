@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0008_topic_entry_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(fields=["date_added"], name="notes_entry_added_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="topic",
+            index=models.Index(fields=["date_added"], name="notes_topic_added_idx"),
+        ),
+    ]
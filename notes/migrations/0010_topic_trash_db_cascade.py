@@ -0,0 +1,114 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+import notes.models
+
+# PostgreSQL only: make the database delete a topic's entries and a user's
+#   topics (notes.models.DB_CASCADE, which stops Django collecting them).
+#   Swapping a constraint locks its table (ACCESS EXCLUSIVE) until commit, so
+#   the migration isn't atomic: the swap adds the new constraint NOT VALID and
+#   commits at once, then VALIDATE scans the rows in a transaction of its own
+#   that lets reads and writes through.
+CONSTRAINTS = [
+    # (table, column, referenced table)
+    ("notes_entry", "topic_id", "notes_topic"),
+    ("notes_topic", "owner_id", "auth_user"),
+]
+
+FIND_SQL = """
+SELECT conname FROM pg_constraint
+WHERE contype = 'f' AND conrelid = %s::regclass AND confrelid = %s::regclass
+"""
+
+SWAP_SQL = """
+ALTER TABLE {table} DROP CONSTRAINT {name},
+    ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {target} (id)
+    ON DELETE {action} DEFERRABLE INITIALLY DEFERRED NOT VALID
+"""
+
+VALIDATE_SQL = "ALTER TABLE {table} VALIDATE CONSTRAINT {name}"
+
+
+def _foreign_keys(schema_editor):
+    """(table, column, referenced table, constraint name) for CONSTRAINTS"""
+    if schema_editor.connection.vendor != "postgresql":
+        return []
+    keys = []
+    for table, column, target in CONSTRAINTS:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(FIND_SQL, [table, target])
+            keys += [(table, column, target, row[0]) for row in cursor.fetchall()]
+    return keys
+
+
+def _set_delete_action(schema_editor, action):
+    for table, column, target, name in _foreign_keys(schema_editor):
+        schema_editor.execute(
+            SWAP_SQL.format(
+                table=table, name=name, column=column, target=target, action=action
+            )
+        )
+
+
+def add_db_cascade(_apps, schema_editor):
+    _set_delete_action(schema_editor, "CASCADE")
+
+
+def remove_db_cascade(_apps, schema_editor):
+    _set_delete_action(schema_editor, "NO ACTION")
+
+
+def validate_constraints(_apps, schema_editor):
+    for table, _, _, name in _foreign_keys(schema_editor):
+        schema_editor.execute(VALIDATE_SQL.format(table=table, name=name))
+
+
+class Migration(migrations.Migration):
+
+    # each RunPython below commits on its own (see CONSTRAINTS)
+    atomic = False
+
+    dependencies = [
+        ("notes", "0009_date_added_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="topic",
+            name="trashed_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name="entry",
+            name="topic",
+            field=models.ForeignKey(
+                on_delete=notes.models.DB_CASCADE, to="notes.topic"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="topic",
+            name="owner",
+            field=models.ForeignKey(
+                on_delete=notes.models.DB_CASCADE, to=settings.AUTH_USER_MODEL
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="topic",
+            index=models.Index(
+                condition=models.Q(("trashed_at__isnull", False)),
+                fields=["trashed_at"],
+                name="notes_topic_trashed_idx",
+            ),
+        ),
+        # validate last both ways: after the swap, and after the swap back
+        migrations.RunPython(
+            migrations.RunPython.noop, validate_constraints, atomic=True
+        ),
+        migrations.RunPython(add_db_cascade, remove_db_cascade, atomic=True),
+        migrations.RunPython(
+            validate_constraints, migrations.RunPython.noop, atomic=True
+        ),
+    ]
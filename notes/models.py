@@ -1,5 +1,128 @@
-from django.db import models
+from collections import Counter
+from datetime import datetime
+from typing import Any, Iterable
+
+from django.db import connections, models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+from django.dispatch import Signal
+from django.utils.safestring import SafeString, mark_safe
+
+from .rendering import render_html
+
+
+def database_cascades(using: str) -> bool:
+    """Whether the database deletes the rows behind DB_CASCADE itself"""
+    # the ON DELETE CASCADE constraints are added by migration 0010
+    return bool(connections[using].vendor == "postgresql")
+
+
+# pylint: disable-next=invalid-name
+def DB_CASCADE(collector: Any, field: Any, sub_objs: Any, using: str) -> None:
+    """
+    on_delete: leave the related rows to the database's ON DELETE CASCADE
+
+    Django's CASCADE loads every related row (and theirs) into memory to
+    delete them and send their signals; deleting a topic or a user then costs
+    as much memory as it has entries. Where the database cascades (PostgreSQL)
+    nothing is collected: one DELETE of the topic or user takes the rest with
+    it, without post_delete signals for the rows it takes. Elsewhere this is
+    CASCADE.
+    """
+    if not database_cascades(using):
+        models.CASCADE(collector, field, sub_objs, using)
+
+
+# don't let the collector evaluate sub_objs just to see if there are any
+DB_CASCADE.lazy_sub_objs = True  # type: ignore[attr-defined]
+
+# Sent by EntryQuerySet.delete() with the owner_ids of the deleted entries'
+#   topics (no post_delete per row does it, see signals.py)
+entries_deleted = Signal()
+
+
+class TopicQuerySet(models.QuerySet):
+    def for_user(self, user: User) -> "TopicQuerySet":
+        """
+        Only the topics owned by the user (no extra query for the owner),
+        leaving out those in the trash
+        """
+        topics: TopicQuerySet = self.filter(owner_id=user.pk, trashed_at__isnull=True)
+        return topics
+
+
+class EntryQuerySet(models.QuerySet):
+    def for_user(self, user: User) -> "EntryQuerySet":
+        """
+        Only the entries in topics owned by the user (and not in the trash),
+        fetched together with their topic in the same query
+        """
+        entries: EntryQuerySet = self.filter(
+            topic__owner_id=user.pk, topic__trashed_at__isnull=True
+        ).select_related("topic")
+        return entries
+
+    # bulk_create()/bulk_update() bypass Entry.save() and its signals: render
+    #   the HTML and keep the topic counters (see the end of this module) here
+    def bulk_create(
+        self, objs: Iterable["Entry"], *args: Any, **kwargs: Any
+    ) -> list["Entry"]:
+        objs = list(objs)
+        for entry in objs:
+            entry.text_html = render_html(entry.text)
+        with transaction.atomic(using=self.db, savepoint=False):
+            created: list[Entry] = super().bulk_create(objs, *args, **kwargs)
+            entries_added(created)
+        return created
+
+    def bulk_update(
+        self, objs: Iterable["Entry"], fields: Iterable[str], *args: Any, **kwargs: Any
+    ) -> int:
+        objs, fields = list(objs), list(fields)
+        if "text" in fields:
+            for entry in objs:
+                entry.text_html = render_html(entry.text)
+            if "text_html" not in fields:
+                fields.append("text_html")
+        # (entry, the topic it moved from)
+        moved: list[tuple[Entry, int]] = []
+        if "topic" in fields:
+            moved = [
+                (entry, moved_from)
+                for entry in objs
+                if (moved_from := entry.moved_from) is not None
+            ]
+        with transaction.atomic(using=self.db, savepoint=False):
+            updated: int = super().bulk_update(objs, fields, *args, **kwargs)
+            if moved:
+                entries_moved(
+                    [entry for entry, _ in moved],
+                    [moved_from for _, moved_from in moved],
+                )
+        for entry, _ in moved:
+            entry.loaded_topic_id = entry.topic_id
+        return updated
+
+    # a queryset delete() bypasses Entry.delete(): take the entries off their
+    #   topics' counters, leave their tombstones and refresh the owners'
+    #   cached topic lists here
+    def delete(self) -> tuple[int, dict[str, int]]:
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = list(self.values_list("id", "topic_id", "topic__owner_id"))
+            deleted: tuple[int, dict[str, int]] = super().delete()
+            entries_removed(Counter(topic_id for _, topic_id, _ in rows))
+            # markers for sync clients, as the post_delete receiver leaves
+            #   for a single entry
+            Tombstone.objects.bulk_create(
+                Tombstone(owner_id=owner_id, kind=Tombstone.ENTRY, object_id=pk)
+                for pk, _, owner_id in rows
+            )
+        entries_deleted.send(
+            sender=Entry, owner_ids={owner_id for _, _, owner_id in rows}
+        )
+        return deleted
 
 
 # Create your models here.
@@ -9,10 +132,43 @@ class Topic(models.Model):
     text = models.CharField(max_length=200)
     # When a topic is created, automatically add a timestamp
     date_added = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save, lets sync clients fetch only what changed
+    date_modified = models.DateTimeField(auto_now=True)
     # The owner sets a foreign key relationship to the User model
     # on_delete ensures that if a user is deleted, all the
-    #   user's associated data is also removed
-    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    #   user's associated data is also removed (by the database where it can)
+    owner = models.ForeignKey(User, on_delete=DB_CASCADE)
+    # Full-text search document, maintained by a database trigger on
+    #   PostgreSQL (unused on SQLite, see notes/search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Kept in step with the topic's entries (see the counters at the end of
+    #   this module), so the topics page can show and sort by them without
+    #   touching the entries
+    entry_count = models.PositiveIntegerField(default=0, editable=False)
+    # Indexed with the owner for the "recent activity" order by migration
+    #   0008 (per database: SQLite can't declare NULLS LAST in an index)
+    last_entry_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Set when the topic is deleted with TOPIC_SOFT_DELETE: hidden from then
+    #   on, and purged with its entries in batches later (see deletion.py)
+    trashed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Topic.objects.for_user(user) scopes lookups to the owner
+    objects = TopicQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["owner", "date_modified"], name="notes_topic_owner_mod_idx"
+            ),
+            # Serves the admin's date hierarchy and date sort (notes/admin.py)
+            models.Index(fields=["date_added"], name="notes_topic_added_idx"),
+            # Finds the trash to purge (only the few trashed topics indexed)
+            models.Index(
+                fields=["trashed_at"],
+                condition=models.Q(trashed_at__isnull=False),
+                name="notes_topic_trashed_idx",
+            ),
+        ]
 
     # Default method (__str__) is called for string output
     def __str__(self) -> str:
@@ -23,15 +179,39 @@ class Topic(models.Model):
 class Entry(models.Model):
     """Note entries for a topic"""
 
-    # delete all all associated topic entries
-    topic = models.ForeignKey(Topic, on_delete=models.CASCADE)
+    # delete all all associated topic entries (by the database where it can)
+    topic = models.ForeignKey(Topic, on_delete=DB_CASCADE)
     text = models.TextField()
+    # The text rendered to (escaped) HTML on save, so pages don't render it on
+    #   every view; empty until backfilled for older rows (see rendering.py)
+    text_html = models.TextField(blank=True, default="", editable=False)
     # When a topic is created, automatically add a timestamp
     date_added = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save (bulk_update callers must set it themselves)
+    date_modified = models.DateTimeField(auto_now=True)
+    # Full-text search document, maintained by a database trigger on
+    #   PostgreSQL (unused on SQLite, see notes/search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Entry.objects.for_user(user) scopes lookups to the topic's owner
+    objects = EntryQuerySet.as_manager()
 
     # Django metaclass to help describe plural entry operations
     class Meta:
         verbose_name_plural = "entries"
+        indexes = [
+            # Serves the topic page's keyset pagination (newest first)
+            models.Index(
+                fields=["topic", "-date_added", "-id"],
+                name="notes_entry_topic_recent_idx",
+            ),
+            # Serves the sync endpoint's "changed since" scan
+            models.Index(
+                fields=["topic", "date_modified"], name="notes_entry_topic_mod_idx"
+            ),
+            # Serves the admin's date hierarchy and date sort (notes/admin.py)
+            models.Index(fields=["date_added"], name="notes_entry_added_idx"),
+        ]
 
     # Default method (__str__) is called for string output
     # limit it to the first 50 charadters
@@ -41,3 +221,187 @@ class Entry(models.Model):
         if len(display_string) > 50:
             display_string = display_string[:50] + "..."
         return display_string
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # the topic as loaded from the database (set by from_db()), to tell a
+        #   move on save (see the counters below)
+        self.loaded_topic_id: int | None = None
+
+    @classmethod
+    def from_db(cls, db: str, field_names: list, values: list) -> "Entry":
+        entry: Entry = super().from_db(db, field_names, values)
+        entry.loaded_topic_id = entry.__dict__.get("topic_id")
+        return entry
+
+    @property
+    def moved_from(self) -> int | None:
+        """The topic id the entry was loaded with, if it has moved since"""
+        loaded = self.loaded_topic_id
+        return loaded if loaded not in (None, self.topic_id) else None
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """Render text_html along with the text, count the entry in its topic"""
+        self.text_html = render_html(self.text)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "text" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "text_html"}
+        adding, moved_from = self._state.adding, self.moved_from
+        with transaction.atomic(using=kwargs.get("using"), savepoint=False):
+            super().save(*args, **kwargs)
+            if adding:
+                entries_added([self])
+            elif moved_from is not None:
+                entries_moved([self], [moved_from])
+        self.loaded_topic_id = self.topic_id
+
+    def delete(self, *args: Any, **kwargs: Any) -> tuple[int, dict]:
+        """Delete the entry and take it off its topic's counters"""
+        with transaction.atomic(using=kwargs.get("using"), savepoint=False):
+            deleted: tuple[int, dict] = super().delete(*args, **kwargs)
+            entries_removed({self.topic_id: 1})
+        return deleted
+
+    @property
+    def html(self) -> SafeString:
+        """The entry's HTML for templates (rendered now if not stored yet)"""
+        html: SafeString = mark_safe(self.text_html or render_html(self.text))
+        return html
+
+
+class Tombstone(models.Model):
+    """
+    Marker left behind when a Topic or Entry is deleted so that sync clients
+    can drop their local copy. Deleting a topic only records the topic: its
+    entries are implied to be gone with it.
+
+    Recorded however the object goes: by the post_delete receivers (see
+    signals.py), by EntryQuerySet.delete(), and when a topic is trashed.
+    """
+
+    TOPIC = "topic"
+    ENTRY = "entry"
+    KIND_CHOICES = [(TOPIC, "Topic"), (ENTRY, "Entry")]
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # id of the deleted object (the row itself no longer exists)
+    object_id = models.BigIntegerField()
+    date_deleted = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["owner", "date_deleted"], name="notes_tomb_owner_del_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.object_id} (deleted)"
+
+    @classmethod
+    def record(cls, owner_id: int, kind: str, object_ids: list[int]) -> None:
+        """Record the deletion of one or more objects in a single INSERT"""
+        cls.objects.bulk_create(
+            [cls(owner_id=owner_id, kind=kind, object_id=pk) for pk in object_ids]
+        )
+
+
+##
+# Per-topic entry counters: Topic.entry_count and Topic.last_entry_at
+#
+# The topics page shows how many entries each topic has and when the latest
+#   one was added, and can sort by that, reading nothing but the topic rows.
+#   The counters are updated in the same transaction as the entry writes, with
+#   UPDATEs relative to the stored values, so concurrent writers can't lose
+#   each other's changes:
+#     entries_added()    entry_count + n, last_entry_at moved forward
+#     entries_removed()  entry_count - n, last_entry_at re-read from the newest
+#                        remaining entry (one lookup on the topic/date index)
+# Entry.save() and Entry.delete() call these, and so do bulk_create(),
+#   bulk_update() and delete() on Entry querysets. Deleting a topic takes its
+#   counters with it. Anything writing entries some other way (raw SQL, COPY)
+#   leaves the counters to reconcile_counters(), also run by:
+#     python manage.py reconcile_counters
+#
+
+
+def _entry_count() -> Coalesce:
+    entries = (
+        Entry.objects.filter(topic_id=OuterRef("id"))
+        .order_by()
+        .values("topic_id")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return Coalesce(Subquery(entries), Value(0))
+
+
+def _last_entry_at() -> Subquery:
+    newest = Entry.objects.filter(topic_id=OuterRef("id")).order_by(
+        "-date_added", "-id"
+    )
+    return Subquery(newest.values("date_added")[:1])
+
+
+def entries_added(entries: Iterable[Entry]) -> None:
+    """Count new entries into their topics (one UPDATE per topic)"""
+    counts: Counter[int] = Counter()
+    latest: dict[int, datetime] = {}
+    for entry in entries:
+        counts[entry.topic_id] += 1
+        latest[entry.topic_id] = max(
+            entry.date_added, latest.get(entry.topic_id, entry.date_added)
+        )
+    for topic_id, count in counts.items():
+        added = Value(latest[topic_id])
+        Topic.objects.filter(id=topic_id).update(
+            entry_count=F("entry_count") + count,
+            last_entry_at=Greatest(Coalesce("last_entry_at", added), added),
+        )
+
+
+def entries_removed(counts: dict[int, int]) -> None:
+    """Take removed entries, as {topic id: number}, off their topics"""
+    for topic_id, count in counts.items():
+        Topic.objects.filter(id=topic_id).update(
+            entry_count=Greatest(F("entry_count") - count, Value(0)),
+            last_entry_at=_last_entry_at(),
+        )
+
+
+def entries_moved(entries: Iterable[Entry], from_topic_ids: Iterable[int]) -> None:
+    """Entries now filed under another topic than before"""
+    entries_removed(Counter(from_topic_ids))
+    entries_added(entries)
+
+
+def reconcile_counters(topic_ids: Iterable[int] | None = None) -> int:
+    """
+    Recount the given topics (all topics by default) from their entries
+
+    Returns:
+        int: the number of topics whose counters were wrong
+    """
+    topics = Topic.objects.all()
+    if topic_ids is not None:
+        topics = topics.filter(id__in=list(topic_ids))
+    wrong = list(
+        topics.alias(actual_count=_entry_count(), actual_last=_last_entry_at())
+        .exclude(
+            entry_count=F("actual_count"),
+            last_entry_at__isnull=False,
+            last_entry_at=F("actual_last"),
+        )
+        .exclude(
+            entry_count=F("actual_count"),
+            last_entry_at__isnull=True,
+            actual_last__isnull=True,
+        )
+        .values_list("id", flat=True)
+    )
+    if wrong:
+        Topic.objects.filter(id__in=wrong).update(
+            entry_count=_entry_count(), last_entry_at=_last_entry_at()
+        )
+    return len(wrong)
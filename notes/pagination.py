@@ -0,0 +1,144 @@
+"""
+Keyset (cursor) pagination for topic entries
+
+Entries are shown newest first, ordered by (date_added, id). Instead of an
+OFFSET, each page remembers the (date_added, id) of its first and last rows
+and the next page filters past that key. The database walks the
+Entry(topic, -date_added, -id) index straight to the page, so the cost of a
+page stays the same no matter how deep the user scrolls.
+"""
+
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Mapping
+
+from django.db.models import Q, QuerySet
+
+# Number of entries shown on a topic page
+PAGE_SIZE = 25
+
+
+@dataclass
+class KeysetPage:
+    """One page of entries plus the cursors to its neighbours"""
+
+    entries: list
+    older_cursor: str | None = None
+    newer_cursor: str | None = None
+
+    @property
+    def has_older(self) -> bool:
+        return self.older_cursor is not None
+
+    @property
+    def has_newer(self) -> bool:
+        return self.newer_cursor is not None
+
+
+def encode_cursor(date_added: datetime, pk: int) -> str:
+    """Pack a (date_added, id) key into an opaque, url-safe token"""
+    raw = f"{date_added.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int] | None:
+    """Unpack a cursor token, or None if it has been tampered with"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        date_part, pk_part = raw.rsplit("|", 1)
+        return datetime.fromisoformat(date_part), int(pk_part)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def page_cursors(params: Mapping[str, str]) -> tuple[str | None, str | None]:
+    """The (before, after) cursors in a page request's query string"""
+    return params.get("before"), params.get("after")
+
+
+def _page_query(
+    entries: QuerySet, before: str | None, after: str | None, page_size: int
+) -> tuple[QuerySet, str]:
+    """
+    The query for a page (one extra row tells if there is more) and its
+    direction: 'first', 'newer' or 'older'
+    """
+    key = None
+    newer = False
+    if after:
+        key = decode_cursor(after)
+        newer = key is not None
+    if key is None and before:
+        key = decode_cursor(before)
+
+    if key is None:
+        # First page: the newest entries
+        return entries.order_by("-date_added", "-id")[: page_size + 1], "first"
+    date_added, pk = key
+    if newer:
+        # Walk forward (ascending) from the key; flipped back in _build_page()
+        query = entries.filter(
+            Q(date_added__gt=date_added) | Q(date_added=date_added, id__gt=pk)
+        ).order_by("date_added", "id")
+        return query[: page_size + 1], "newer"
+    query = entries.filter(
+        Q(date_added__lt=date_added) | Q(date_added=date_added, id__lt=pk)
+    ).order_by("-date_added", "-id")
+    return query[: page_size + 1], "older"
+
+
+def _build_page(rows: list, direction: str, page_size: int) -> KeysetPage:
+    """Trim the extra row, restore newest-first order and set the cursors"""
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == "first":
+        has_older, has_newer = has_more, False
+    elif direction == "newer":
+        rows = rows[::-1]
+        has_older, has_newer = True, has_more
+    else:
+        has_older, has_newer = has_more, True
+
+    page = KeysetPage(entries=rows)
+    if rows:
+        if has_older:
+            page.older_cursor = encode_cursor(rows[-1].date_added, rows[-1].id)
+        if has_newer:
+            page.newer_cursor = encode_cursor(rows[0].date_added, rows[0].id)
+    return page
+
+
+def paginate_entries(
+    entries: QuerySet,
+    before: str | None = None,
+    after: str | None = None,
+    page_size: int = PAGE_SIZE,
+) -> KeysetPage:
+    """
+    Return a page of entries, newest first
+
+    Args:
+        entries (QuerySet): the entries to page through (e.g. topic.entry_set)
+        before (str): cursor; show the entries older than this key
+        after (str): cursor; show the entries newer than this key
+        page_size (int): the number of entries per page
+
+    Returns:
+        KeysetPage: the entries with the older/newer cursors (None at the ends)
+    """
+    query, direction = _page_query(entries, before, after, page_size)
+    return _build_page(list(query), direction, page_size)
+
+
+async def apaginate_entries(
+    entries: QuerySet,
+    before: str | None = None,
+    after: str | None = None,
+    page_size: int = PAGE_SIZE,
+) -> KeysetPage:
+    """Async version of paginate_entries() for the async views"""
+    query, direction = _page_query(entries, before, after, page_size)
+    return _build_page([row async for row in query], direction, page_size)
@@ -0,0 +1,21 @@
+"""
+Entry text to HTML, done once when an entry is written
+
+Entries are plain text: the HTML is the text with everything escaped, split
+into <p> and <br> at blank lines and newlines (what the |linebreaks filter used
+to do for every entry on every page view). Since nothing the user typed is
+left unescaped, the stored HTML can be output as is.
+
+Entry.save(), and bulk_create()/bulk_update() on Entry querysets, keep
+Entry.text_html in step with the text. Rows written before the column existed
+(or before a change to render_html()) are filled in by:
+    python manage.py render_entries [--all]
+"""
+
+from django.utils.html import linebreaks
+
+
+def render_html(text: str) -> str:
+    """The stored HTML for an entry's text"""
+    html: str = linebreaks(text, autoescape=True)
+    return html
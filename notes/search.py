@@ -0,0 +1,242 @@
+"""
+Full-text search over a user's topics and entries
+
+PostgreSQL: Topic/Entry carry a stored `search_vector` (tsvector) kept current
+by a BEFORE INSERT/UPDATE trigger, so save(), bulk_create() and bulk_update()
+all stay indexed. A GIN index on the column serves the match (see migration
+0006_search_vector).
+
+SQLite (local development and tests): an FTS5 external-content table per
+model, maintained by triggers. They are (re)installed after every migrate
+because SQLite migrations rebuild tables and drop their triggers.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import F
+from django.utils.dateparse import parse_datetime
+from django.utils.html import escape
+
+from .models import Topic, Entry
+
+# Text search configuration used for the stored vectors and the queries
+SEARCH_CONFIG = "english"
+# Maximum number of hits returned per model
+SEARCH_LIMIT = 50
+
+# Highlight markers: control characters that cannot appear in a form field,
+#   swapped for <mark> tags once the snippet has been HTML-escaped
+_START, _STOP = "\x02", "\x03"
+
+# Tables backing the SQLite fallback
+_SQLITE_FTS_TABLES = {
+    "notes_topic": "notes_topic_fts",
+    "notes_entry": "notes_entry_fts",
+}
+
+
+@dataclass
+class SearchHit:
+    """One matching topic or entry"""
+
+    id: int
+    topic_id: int
+    topic_text: str
+    snippet: str  # HTML-safe, matches wrapped in <mark>
+    rank: float
+    date_added: datetime
+
+
+@dataclass
+class SearchResults:
+    topics: list[SearchHit]
+    entries: list[SearchHit]
+
+
+def _highlight(snippet: str) -> str:
+    """Escape a raw snippet, then turn the match markers into <mark> tags"""
+    html: str = escape(snippet)
+    return html.replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def search(user_id: int, query: str, limit: int = SEARCH_LIMIT) -> SearchResults:
+    """
+    Search the user's topics and entries, best matches first
+
+    Args:
+        user_id (int): only this user's notes are searched
+        query (str): search terms, e.g. 'virtual environments'
+        limit (int): maximum number of hits per model
+
+    Returns:
+        SearchResults: ranked topic and entry hits with highlighted snippets
+    """
+    if not _terms(query):
+        return SearchResults(topics=[], entries=[])
+    if connection.vendor == "postgresql":
+        return _search_postgresql(user_id, query, limit)
+    return _search_sqlite(user_id, query, limit)
+
+
+def _terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query)
+
+
+##
+# PostgreSQL: stored tsvector + GIN index
+#
+def _search_postgresql(user_id: int, query: str, limit: int) -> SearchResults:
+    search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+
+    def ranked(queryset, text_field: str):
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(
+                rank=SearchRank(F("search_vector"), search_query),
+                snippet=SearchHeadline(
+                    text_field,
+                    search_query,
+                    config=SEARCH_CONFIG,
+                    start_sel=_START,
+                    stop_sel=_STOP,
+                    max_fragments=2,
+                ),
+            )
+            .order_by("-rank", "-id")[:limit]
+        )
+
+    topics = ranked(
+        Topic.objects.filter(owner_id=user_id, trashed_at__isnull=True), "text"
+    )
+    entries = ranked(
+        Entry.objects.filter(
+            topic__owner_id=user_id, topic__trashed_at__isnull=True
+        ).select_related("topic"),
+        "text",
+    )
+    return SearchResults(
+        topics=[
+            SearchHit(t.id, t.id, t.text, _highlight(t.snippet), t.rank, t.date_added)
+            for t in topics
+        ],
+        entries=[
+            SearchHit(
+                e.id,
+                e.topic_id,
+                e.topic.text,
+                _highlight(e.snippet),
+                e.rank,
+                e.date_added,
+            )
+            for e in entries
+        ],
+    )
+
+
+##
+# SQLite: FTS5 fallback
+#
+def _fts5_query(query: str) -> str:
+    """Quote every term so user input can't trip over the FTS5 query syntax"""
+    return " ".join(f'"{term}"' for term in _terms(query))
+
+
+def _fts5_sql(fts: str, columns: str, joins: str) -> str:
+    """
+    Ranked FTS5 match scoped to an owner, outside the trash (functions need
+    the real table name)
+    """
+    return f"""
+        SELECT {columns}, snippet({fts}, 0, '{_START}', '{_STOP}', '...', 16),
+            bm25({fts})
+        FROM {fts} JOIN {joins}
+        WHERE {fts} MATCH %s AND t.owner_id = %s AND t.trashed_at IS NULL
+        ORDER BY bm25({fts}) LIMIT %s
+    """
+
+
+def _search_sqlite(user_id: int, query: str, limit: int) -> SearchResults:
+    params = [_fts5_query(query), user_id, limit]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _fts5_sql(
+                "notes_topic_fts",
+                "t.id, t.id, t.text, t.date_added",
+                "notes_topic AS t ON t.id = notes_topic_fts.rowid",
+            ),
+            params,
+        )
+        topic_rows = cursor.fetchall()
+        cursor.execute(
+            _fts5_sql(
+                "notes_entry_fts",
+                "e.id, e.topic_id, t.text, e.date_added",
+                "notes_entry AS e ON e.id = notes_entry_fts.rowid "
+                "JOIN notes_topic AS t ON t.id = e.topic_id",
+            ),
+            params,
+        )
+        entry_rows = cursor.fetchall()
+
+    def hit(row: tuple) -> SearchHit:
+        pk, topic_id, topic_text, date_added, raw_snippet, score = row
+        if isinstance(date_added, str):
+            # Raw SQLite rows hold naive UTC text timestamps
+            date_added = parse_datetime(date_added).replace(tzinfo=timezone.utc)
+        # bm25() is lower-is-better; flip it so rank reads like PostgreSQL's
+        return SearchHit(
+            pk, topic_id, topic_text, _highlight(raw_snippet), -score, date_added
+        )
+
+    return SearchResults(
+        topics=[hit(row) for row in topic_rows],
+        entries=[hit(row) for row in entry_rows],
+    )
+
+
+def install_sqlite_fts(using: str = DEFAULT_DB_ALIAS, **_kwargs: object) -> None:
+    """
+    Create the FTS5 tables and their sync triggers if missing (SQLite only)
+
+    Connected to post_migrate. Safe to run repeatedly: when the triggers
+    already exist nothing happens, otherwise they are created and the index
+    is rebuilt from the base table.
+    """
+    db = connections[using]
+    if db.vendor != "sqlite":
+        return
+    with db.cursor() as cursor:
+        existing = set(db.introspection.table_names(cursor))
+        for table, fts in _SQLITE_FTS_TABLES.items():
+            if table not in existing:
+                continue  # migrated back past the notes tables
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s",
+                [f"{fts}_ai"],
+            )
+            if cursor.fetchone():
+                continue
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"text, content='{table}', content_rowid='id')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} "
+                f"BEGIN INSERT INTO {fts}({fts}, rowid, text) "
+                f"VALUES ('delete', old.id, old.text); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF text "
+                f"ON {table} BEGIN INSERT INTO {fts}({fts}, rowid, text) "
+                f"VALUES ('delete', old.id, old.text); "
+                f"INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END"
+            )
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
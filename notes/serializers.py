@@ -0,0 +1,69 @@
+"""
+REST API serializers for the notes app
+"""
+
+from rest_framework import serializers
+
+from .models import Topic, Entry
+
+# Upper bound on the number of rows accepted by a single bulk request
+MAX_BULK_ITEMS = 1000
+
+
+class TopicSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Topic
+        fields = [
+            "id",
+            "text",
+            "date_added",
+            "date_modified",
+            "entry_count",
+            "last_entry_at",
+        ]
+        read_only_fields = ["date_added", "date_modified"]
+
+
+class EntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Entry
+        fields = ["id", "topic", "text", "date_added", "date_modified"]
+        read_only_fields = ["date_added", "date_modified"]
+
+    def validate_topic(self, topic: Topic) -> Topic:
+        """Only allow entries to be filed under the requesting user's topics"""
+        if (
+            topic.owner_id != self.context["request"].user.pk
+            or topic.trashed_at is not None
+        ):
+            raise serializers.ValidationError("Topic not found.")
+        return topic
+
+
+##
+# Bulk payloads
+#
+# The topic is a plain id here: ownership of every referenced topic is
+#   checked with a single query in the view rather than one lookup per row.
+#   They only validate input, the view writes the rows: no create()/update()
+class BulkEntryCreateSerializer(  # pylint: disable=abstract-method
+    serializers.Serializer
+):
+    topic = serializers.IntegerField()
+    text = serializers.CharField()
+
+
+class BulkEntryUpdateSerializer(  # pylint: disable=abstract-method
+    serializers.Serializer
+):
+    id = serializers.IntegerField()
+    topic = serializers.IntegerField(required=False)
+    text = serializers.CharField(required=False)
+
+
+class BulkEntryDeleteSerializer(  # pylint: disable=abstract-method
+    serializers.Serializer
+):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=MAX_BULK_ITEMS
+    )
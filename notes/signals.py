@@ -0,0 +1,63 @@
+"""
+Model signal receivers for the notes app (connected in NotesConfig.ready)
+"""
+
+from typing import Any, Iterable
+
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_user_topics
+from .models import Topic, Entry, Tombstone, entries_deleted
+
+
+@receiver([post_save, post_delete], sender=Topic)
+def topic_changed(instance: Topic, **_kwargs: Any) -> None:
+    """A topic was created, edited or deleted: refresh its owner's list"""
+    invalidate_user_topics(instance.owner_id)
+
+
+@receiver(post_delete, sender=Topic)
+def topic_deleted(instance: Topic, origin: Any = None, **_kwargs: Any) -> None:
+    """
+    Leave a tombstone for sync clients (its entries are implied to go with it)
+
+    Not for a trashed topic, which got its tombstone when it was trashed, nor
+    when its owner is being deleted, tombstones and all.
+    """
+    deleting_user = isinstance(origin, User) or (
+        isinstance(origin, QuerySet) and origin.model is User
+    )
+    if instance.trashed_at is None and not deleting_user:
+        Tombstone.record(instance.owner_id, Tombstone.TOPIC, [instance.id])
+
+
+@receiver(post_save, sender=Entry)
+def entry_saved(instance: Entry, **_kwargs: Any) -> None:
+    """An entry was created or edited"""
+    invalidate_user_topics(instance.topic.owner_id)
+
+
+@receiver(post_delete, sender=Entry)
+def entry_deleted(instance: Entry, **kwargs: Any) -> None:
+    """
+    An entry was deleted on its own: leave a tombstone for sync clients
+
+    Entries removed by a cascade (topic or user deletion) are covered by the
+    topic's own signal and tombstone, and queryset deletes handle the batch at
+    once (see EntryQuerySet.delete()), so neither costs a topic lookup per row
+    here.
+    """
+    if kwargs.get("origin") is instance:
+        owner_id = instance.topic.owner_id
+        Tombstone.record(owner_id, Tombstone.ENTRY, [instance.id])
+        invalidate_user_topics(owner_id)
+
+
+@receiver(entries_deleted, sender=Entry)
+def entries_batch_deleted(owner_ids: Iterable[int], **_kwargs: Any) -> None:
+    """A queryset delete() removed entries of these users' topics"""
+    for owner_id in owner_ids:
+        invalidate_user_topics(owner_id)
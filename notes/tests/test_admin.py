@@ -0,0 +1,57 @@
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Entry, Topic
+
+
+class AdminTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.admin = User.objects.create_superuser(username="ops", password="pw")
+        self.client.force_login(self.admin)
+        self.owner = User.objects.create_user(username="writer", password="pw")
+        self.topic = Topic.objects.create(text="Running log", owner=self.owner)
+
+    def changelist_queries(self, entries: int) -> int:
+        Entry.objects.bulk_create(
+            Entry(topic=self.topic, text=f"run {i}") for i in range(entries)
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("admin:notes_entry_changelist"))
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_entry_changelist_queries_do_not_grow_with_rows(self) -> None:
+        # session and user loaded (and cached) by a first request
+        self.changelist_queries(0)
+        few = self.changelist_queries(2)
+        self.assertEqual(self.changelist_queries(30), few)
+
+    def test_search_by_text_username_and_id(self) -> None:
+        entry = Entry.objects.create(topic=self.topic, text="hill repeats")
+        Entry.objects.create(topic=self.topic, text="easy run")
+        url = reverse("admin:notes_entry_changelist")
+        for term, expected in (("hill", 1), ("writer", 2), (str(entry.id), 1)):
+            response = self.client.get(url, {"q": term})
+            self.assertEqual(response.context["cl"].result_count, expected, term)
+
+    def test_change_form_lists_no_topics(self) -> None:
+        Topic.objects.create(text="Someone else's secret", owner=self.owner)
+        entry = Entry.objects.create(topic=self.topic, text="tempo")
+        response = self.client.get(reverse("admin:notes_entry_change", args=[entry.id]))
+        self.assertContains(response, "Running log")
+        self.assertNotContains(response, "Someone else&#x27;s secret")
+
+    def test_search_results_keep_the_model_admin_signature(self) -> None:
+        model_admin = admin.site.get_model_admin(Topic)
+        request = RequestFactory().get("/")
+        queryset, duplicates = model_admin.get_search_results(
+            request=request, queryset=Topic.objects.all(), search_term="writer"
+        )
+        self.assertEqual(list(queryset), [self.topic])
+        self.assertFalse(duplicates)
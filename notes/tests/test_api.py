@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..models import Entry, Tombstone, Topic
+
+
+class EntryApiTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username="api", password="pw")
+        self.other = User.objects.create_user(username="other", password="pw")
+        self.topic = Topic.objects.create(text="Mine", owner=self.user)
+        self.other_topic = Topic.objects.create(text="Theirs", owner=self.other)
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.bulk_url = reverse("notes:api-entries-bulk")
+
+    def test_requires_token(self) -> None:
+        response = self.client.get(reverse("notes:api-topics"))
+        self.assertEqual(response.status_code, 401)
+
+    def test_topics_scoped_to_user(self) -> None:
+        response = self.client.get(reverse("notes:api-topics"), **self.auth)
+        self.assertEqual([t["text"] for t in response.json()], ["Mine"])
+        response = self.client.get(
+            reverse("notes:api-topic", args=[self.other_topic.id]), **self.auth
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk_create_update_delete(self) -> None:
+        payload = [{"topic": self.topic.id, "text": f"note {i}"} for i in range(50)]
+        response = self.client.post(
+            self.bulk_url, payload, content_type="application/json", **self.auth
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Entry.objects.filter(topic=self.topic).count(), 50)
+
+        ids = [row["id"] for row in response.json()]
+        updates = [{"id": pk, "text": "edited"} for pk in ids[:10]]
+        response = self.client.patch(
+            self.bulk_url, updates, content_type="application/json", **self.auth
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Entry.objects.filter(text="edited").count(), 10)
+
+        response = self.client.delete(
+            self.bulk_url, {"ids": ids}, content_type="application/json", **self.auth
+        )
+        self.assertEqual(response.json(), {"deleted": 50})
+
+    def test_bulk_create_rejects_foreign_topic(self) -> None:
+        payload = [
+            {"topic": self.topic.id, "text": "ok"},
+            {"topic": self.other_topic.id, "text": "sneaky"},
+        ]
+        response = self.client.post(
+            self.bulk_url, payload, content_type="application/json", **self.auth
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Entry.objects.exists())
+
+
+@override_settings(SYNC_CURSOR_OVERLAP=0)
+class SyncApiTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username="syncer", password="pw")
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.url = reverse("notes:api-sync")
+
+    def sync(self, since: str | None = None) -> dict:
+        params = {"since": since} if since else {}
+        response = self.client.get(self.url, params, **self.auth)
+        self.assertEqual(response.status_code, 200)
+        delta: dict = response.json()
+        return delta
+
+    def test_delta_since_cursor(self) -> None:
+        topic = Topic.objects.create(text="Old", owner=self.user)
+        old_entry = Entry.objects.create(topic=topic, text="old")
+        snapshot = self.sync()
+        self.assertEqual(len(snapshot["topics"]), 1)
+        self.assertEqual(len(snapshot["entries"]), 1)
+
+        new_entry = Entry.objects.create(topic=topic, text="new")
+        self.client.force_login(self.user)
+        self.client.post(reverse("notes:delete_entry", args=[old_entry.id]))
+
+        delta = self.sync(snapshot["cursor"])
+        self.assertEqual([e["id"] for e in delta["entries"]], [new_entry.id])
+        self.assertEqual(delta["topics"], [])
+        self.assertEqual(delta["deleted"]["entries"], [old_entry.id])
+
+    def test_topic_delete_leaves_tombstone(self) -> None:
+        topic = Topic.objects.create(text="Doomed", owner=self.user)
+        cursor = self.sync()["cursor"]
+        self.client.force_login(self.user)
+        self.client.post(reverse("notes:delete_topic", args=[topic.id]))
+        self.assertEqual(self.sync(cursor)["deleted"]["topics"], [topic.id])
+
+    def test_deletes_outside_the_views_leave_tombstones(self) -> None:
+        topic = Topic.objects.create(text="Admin", owner=self.user)
+        entries = Entry.objects.bulk_create(
+            Entry(topic=topic, text=f"note {i}") for i in range(3)
+        )
+        ids = [topic.id] + [entry.id for entry in entries]
+        cursor = self.sync()["cursor"]
+        entries[0].delete()
+        Entry.objects.filter(id=entries[1].id).delete()
+        topic.delete()  # takes entries[2] with it
+        deleted = self.sync(cursor)["deleted"]
+        self.assertEqual(deleted["topics"], ids[:1])
+        self.assertEqual(sorted(deleted["entries"]), ids[1:3])
+
+    def test_deleting_user_leaves_no_tombstones(self) -> None:
+        Topic.objects.create(text="Gone", owner=self.user)
+        self.user.delete()
+        self.assertFalse(Tombstone.objects.exists())
+
+    @override_settings(SYNC_CURSOR_OVERLAP=60)
+    def test_cursor_overlaps_late_commits(self) -> None:
+        topic = Topic.objects.create(text="Slow", owner=self.user)
+        cursor = self.sync()["cursor"]
+        # stamped before the sync, committed after it read the tables
+        entry = Entry.objects.create(topic=topic, text="late")
+        Entry.objects.filter(id=entry.id).update(
+            date_modified=timezone.now() - timedelta(seconds=5)
+        )
+        self.assertIn(entry.id, [e["id"] for e in self.sync(cursor)["entries"]])
+
+    def test_invalid_cursor(self) -> None:
+        response = self.client.get(self.url, {"since": "yesterday"}, **self.auth)
+        self.assertEqual(response.status_code, 400)
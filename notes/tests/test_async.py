@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import include, path, reverse
+
+from .. import async_views, urls as notes_urls
+from ..models import Entry, Topic
+from ..pagination import PAGE_SIZE
+
+
+class AsyncUrls:
+    """The site's URLs with the read pages served by async_views"""
+
+    urlpatterns = [
+        path(
+            "",
+            include(
+                (
+                    [
+                        path("", async_views.index, name="index"),
+                        path("topics/", async_views.topics, name="topics"),
+                        path(
+                            "topics/<int:topic_id>/",
+                            async_views.topic,
+                            name="topic",
+                        ),
+                        *notes_urls.urlpatterns,
+                    ],
+                    "notes",
+                )
+            ),
+        ),
+        path("accounts/", include("accounts.urls")),
+    ]
+
+
+@override_settings(ROOT_URLCONF=AsyncUrls)
+class AsyncViewsTest(TestCase):
+    def setUp(self) -> None:
+        # cached topic lists of earlier tests' users (ids get reused)
+        cache.clear()
+        self.user = User.objects.create_user(username="async", password="pw")
+        self.topic = Topic.objects.create(text="Async topic", owner=self.user)
+        for i in range(PAGE_SIZE + 1):
+            Entry.objects.create(topic=self.topic, text=f"entry {i}")
+        other = User.objects.create_user(username="other", password="pw")
+        self.other_topic = Topic.objects.create(text="Not mine", owner=other)
+
+    async def test_topics_and_topic(self) -> None:
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("notes:topics"))
+        self.assertContains(response, "Async topic")
+        self.assertNotContains(response, "Not mine")
+
+        url = reverse("notes:topic", args=[self.topic.id])
+        page = (await self.async_client.get(url)).context["page"]
+        self.assertEqual(page.entries[0].text, f"entry {PAGE_SIZE}")
+        older = await self.async_client.get(url, {"before": page.older_cursor})
+        self.assertEqual([e.text for e in older.context["entries"]], ["entry 0"])
+
+        url = reverse("notes:topic", args=[self.other_topic.id])
+        self.assertEqual((await self.async_client.get(url)).status_code, 404)
+
+    async def test_not_modified(self) -> None:
+        await self.async_client.aforce_login(self.user)
+        await self.async_client.get(reverse("accounts:login"))
+        response = await self.async_client.get(reverse("notes:topics"))
+        response = await self.async_client.get(
+            reverse("notes:topics"), headers={"if-none-match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_anonymous(self) -> None:
+        response = await self.async_client.get(reverse("notes:index"))
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(reverse("notes:topics"))
+        self.assertEqual(response.status_code, 302)
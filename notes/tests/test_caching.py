@@ -0,0 +1,100 @@
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..cache import cache_stats
+from ..models import Entry, Topic
+
+
+@override_settings(TOPICS_CACHE=True)
+class TopicsCacheTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username="cached", password="pw")
+        self.client.force_login(self.user)
+        Topic.objects.create(text="First", owner=self.user)
+
+    def test_second_request_skips_topic_query(self) -> None:
+        before = cache_stats()
+        self.client.get(reverse("notes:topics"))
+        response = self.client.get(reverse("notes:topics"))
+        self.assertContains(response, "First")
+        after = cache_stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+
+    def test_topic_and_entry_changes_invalidate(self) -> None:
+        self.client.get(reverse("notes:topics"))
+        with self.captureOnCommitCallbacks(execute=True):
+            topic = Topic.objects.create(text="Second", owner=self.user)
+        self.assertContains(self.client.get(reverse("notes:topics")), "Second")
+
+        version = cache.get(f"notes:topics:version:{self.user.id}")
+        with self.captureOnCommitCallbacks(execute=True):
+            Entry.objects.create(topic=topic, text="bump")
+        self.assertEqual(cache.get(f"notes:topics:version:{self.user.id}"), version + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            topic.delete()
+        self.assertNotContains(self.client.get(reverse("notes:topics")), "Second")
+
+    def test_off_without_a_shared_cache(self) -> None:
+        # a version in a per-process cache would only be bumped in one process
+        with override_settings(TOPICS_CACHE=False):
+            before = cache_stats()
+            self.client.get(reverse("notes:topics"))
+            Topic.objects.create(text="Second", owner=self.user)
+            response = self.client.get(reverse("notes:topics"))
+        self.assertContains(response, "Second")
+        self.assertEqual(cache_stats(), before)
+        self.assertIsNone(cache.get(f"notes:topics:version:{self.user.id}"))
+
+
+class EntryFragmentCacheTest(TestCase):
+    def setUp(self) -> None:
+        caches["template_fragments"].clear()
+        self.user = User.objects.create_user(username="frag", password="pw")
+        self.topic = Topic.objects.create(text="Cards", owner=self.user)
+        self.entry = Entry.objects.create(topic=self.topic, text="first draft")
+        self.client.force_login(self.user)
+        self.url = reverse("notes:topic", args=[self.topic.id])
+
+    def card_key(self) -> str:
+        key: str = make_template_fragment_key(
+            "entry_card",
+            [self.entry.id, self.entry.date_modified, self.entry.text_html],
+        )
+        return key
+
+    def test_card_cached_until_edited(self) -> None:
+        self.assertContains(self.client.get(self.url), "first draft")
+        self.assertIn("first draft", caches["template_fragments"].get(self.card_key()))
+
+        self.entry.text = "second draft"
+        self.entry.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, "second draft")
+        self.assertNotContains(response, "first draft")
+
+    def test_rerendered_html_gets_a_new_card(self) -> None:
+        self.client.get(self.url)
+        # what render_entries --all does in one process: the others' caches
+        #   must not serve the old card either
+        Entry.objects.filter(id=self.entry.id).update(text_html="<p>re-rendered</p>")
+        self.assertContains(self.client.get(self.url), "re-rendered")
+
+    def test_render_benchmark(self) -> None:
+        out = StringIO()
+        call_command(
+            "bench_render", entries=50, repeat=2, stdout=out, stderr=StringIO()
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual(
+            set(report["setups"]), {"uncached", "cached_loader", "cached_fragments"}
+        )
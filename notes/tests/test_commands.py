@@ -0,0 +1,37 @@
+from io import StringIO
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Entry
+
+
+class SeedCommandTest(TestCase):
+    def seed(self, **options: Any) -> None:
+        call_command("seed", stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_volume_is_batched_and_deterministic(self) -> None:
+        self.seed(users=3, topics=2, entries=5, batch_size=4)
+        self.assertEqual(
+            User.objects.filter(username__startswith="seeduser").count(), 3
+        )
+        self.assertEqual(
+            Entry.objects.filter(topic__owner__username="seeduser0000001").count(), 10
+        )
+        first_run = list(Entry.objects.order_by("id").values_list("text", flat=True))
+
+        self.seed(users=3, topics=2, entries=5, batch_size=4)
+        second_run = list(Entry.objects.order_by("id").values_list("text", flat=True))
+        self.assertEqual(first_run, second_run)
+
+    def test_append_keeps_existing_data(self) -> None:
+        self.seed(users=2, topics=1, entries=2)
+        self.seed(users=2, topics=1, entries=2, append=True)
+        self.assertEqual(
+            User.objects.filter(username__startswith="seeduser").count(), 4
+        )
+        self.assertTrue(User.objects.filter(username="seeduser0000004").exists())
+        # the base test data (3 entries) plus 4 users x 1 topic x 2 entries
+        self.assertEqual(Entry.objects.count(), 3 + 8)
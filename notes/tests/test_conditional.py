@@ -0,0 +1,84 @@
+import time
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..models import Entry, Topic
+
+
+class ConditionalGetTest(TestCase):
+    # the session; the user is cached by then (accounts/usercache.py)
+    AUTH_QUERIES = 1
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username="cond", password="pw")
+        self.topic = Topic.objects.create(text="Cached", owner=self.user)
+        self.entry = Entry.objects.create(topic=self.topic, text="note")
+        self.client.force_login(self.user)
+        # a browser has the CSRF cookie (part of the ETag) from the login page
+        self.client.get(reverse("accounts:login"))
+
+    def revalidate(self, url: str, etag: str, **headers: Any) -> Any:
+        return self.client.get(url, headers={"if-none-match": etag, **headers})
+
+    def test_topics_page(self) -> None:
+        url = reverse("notes:topics")
+        first = self.client.get(url)
+        self.assertIn("private", first["Cache-Control"])
+        # only the aggregate: no rendering, no topics query
+        with self.assertNumQueries(self.AUTH_QUERIES + 1):
+            response = self.revalidate(url, first["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        Topic.objects.create(text="New", owner=self.user)
+        self.assertEqual(self.revalidate(url, first["ETag"]).status_code, 200)
+
+    def test_topic_page_edits_and_deletes(self) -> None:
+        url = reverse("notes:topic", args=[self.topic.id])
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+        self.entry.text = "edited"
+        self.entry.save()
+        response = self.revalidate(url, etag)
+        self.assertContains(response, "edited")
+
+        etag = response["ETag"]
+        self.entry.delete()
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+    def test_no_last_modified(self) -> None:
+        # a deletion moves no timestamp: If-Modified-Since can't see it
+        url = reverse("notes:topic", args=[self.topic.id])
+        self.assertNotIn("Last-Modified", self.client.get(url))
+        self.entry.delete()
+        since = http_date(time.time() + 60)
+        response = self.client.get(url, headers={"if-modified-since": since})
+        self.assertEqual(response.status_code, 200)
+
+    def test_topic_page_query_string(self) -> None:
+        url = reverse("notes:topic", args=[self.topic.id])
+        etag = self.client.get(url)["ETag"]
+        # another page of entries is another representation
+        response = self.revalidate(f"{url}?before=1", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_other_users_topic_still_404(self) -> None:
+        other = User.objects.create_user(username="other", password="pw")
+        self.client.force_login(other)
+        url = reverse("notes:topic", args=[self.topic.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_api_topic_list(self) -> None:
+        auth = f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        url = reverse("notes:api-topics")
+        etag = self.client.get(url, headers={"authorization": auth})["ETag"]
+        response = self.revalidate(url, etag, authorization=auth)
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,113 @@
+from io import StringIO
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models.deletion import Collector
+from django.db.models.signals import post_delete
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..deletion import delete_topic, purge_trash
+from ..models import Entry, Tombstone, Topic
+from ..search import search
+
+
+@override_settings(TOPIC_SOFT_DELETE=True)
+class TopicTrashTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username="tidy", password="pw")
+        self.client.force_login(self.user)
+        self.topic = Topic.objects.create(text="Old project", owner=self.user)
+        Entry.objects.bulk_create(
+            Entry(topic=self.topic, text=f"stale note {i}") for i in range(7)
+        )
+        self.kept = Topic.objects.create(text="Current project", owner=self.user)
+        Entry.objects.create(topic=self.kept, text="fresh note")
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def test_delete_hides_at_once(self) -> None:
+        self.client.get(reverse("notes:topics"))  # cache the list
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("notes:delete_topic", args=[self.topic.id]))
+
+        # still stored, but nowhere to be seen
+        self.assertEqual(Entry.objects.filter(topic=self.topic).count(), 7)
+        response = self.client.get(reverse("notes:topics"))
+        self.assertNotContains(response, "Old project")
+        topic_url = reverse("notes:topic", args=[self.topic.id])
+        self.assertEqual(self.client.get(topic_url).status_code, 404)
+        self.assertEqual(search(self.user.id, "stale").entries, [])
+        entries = self.client.get(reverse("notes:api-entries"), **self.auth).json()
+        self.assertEqual(
+            [entry["text"] for entry in entries["results"]], ["fresh note"]
+        )
+        sync = self.client.get(reverse("notes:api-sync"), **self.auth).json()
+        self.assertEqual([topic["id"] for topic in sync["topics"]], [self.kept.id])
+
+    def test_purge_in_batches(self) -> None:
+        url = reverse("notes:api-topic", args=[self.topic.id])
+        self.assertEqual(self.client.delete(url, **self.auth).status_code, 204)
+        out = StringIO()
+        call_command("purge_trash", batch_size=3, stdout=out, stderr=StringIO())
+        self.assertIn("Purged 1 topics and 7 entries", out.getvalue())
+        self.assertFalse(Topic.objects.filter(id=self.topic.id).exists())
+        self.assertFalse(Entry.objects.filter(topic_id=self.topic.id).exists())
+        self.assertEqual(Entry.objects.filter(topic=self.kept).count(), 1)
+
+    def test_purge_sends_no_entry_signals(self) -> None:
+        # why purge_trash() uses _raw_delete(): Entry has a post_delete
+        #   receiver, so delete() can't take the fast path
+        self.assertFalse(
+            Collector(using="default").can_fast_delete(Entry.objects.all())
+        )
+        deleted: list[int] = []
+
+        def entry_deleted(instance: Entry, **_kwargs: Any) -> None:
+            deleted.append(instance.id)
+
+        post_delete.connect(entry_deleted, sender=Entry)
+        self.addCleanup(post_delete.disconnect, entry_deleted, sender=Entry)
+        delete_topic(self.topic)
+        self.assertEqual(purge_trash(batch_size=3), (1, 7))
+        self.assertEqual(deleted, [])
+        # the topic's tombstone stands for its entries
+        self.assertFalse(Tombstone.objects.filter(kind=Tombstone.ENTRY).exists())
+
+    def test_purge_one_users_trash(self) -> None:
+        other = User.objects.create_user(username="other", password="pw")
+        theirs = Topic.objects.create(text="Their project", owner=other)
+        delete_topic(self.topic)
+        delete_topic(theirs)
+        self.assertEqual(purge_trash(owner_id=other.id), (1, 0))
+        self.assertTrue(Topic.objects.filter(id=self.topic.id).exists())
+        self.assertFalse(Topic.objects.filter(id=theirs.id).exists())
+
+    def test_no_new_entries_in_trashed_topic(self) -> None:
+        url = reverse("notes:api-topic", args=[self.topic.id])
+        self.assertEqual(self.client.delete(url, **self.auth).status_code, 204)
+        response = self.client.post(
+            reverse("notes:api-entries"),
+            {"topic": self.topic.id, "text": "too late"},
+            content_type="application/json",
+            **self.auth,
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["topic"], ["Topic not found."])
+        self.assertEqual(Entry.objects.filter(topic=self.topic).count(), 7)
+
+    @override_settings(TOPIC_SOFT_DELETE=False)
+    def test_hard_delete(self) -> None:
+        self.client.post(reverse("notes:delete_topic", args=[self.topic.id]))
+        self.assertFalse(Topic.objects.filter(id=self.topic.id).exists())
+        self.assertFalse(Entry.objects.filter(topic_id=self.topic.id).exists())
+
+    def test_deleting_user_takes_topics_and_entries(self) -> None:
+        # DB_CASCADE falls back to Django's CASCADE on SQLite
+        self.user.delete()
+        self.assertFalse(Topic.objects.exists())
+        self.assertFalse(Entry.objects.exists())
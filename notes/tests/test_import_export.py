@@ -0,0 +1,154 @@
+import csv
+import io
+import json
+import zipfile
+from typing import Any
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .. import export
+from ..importer import import_notes
+from ..models import Entry, Topic
+
+
+class ExportTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username="exporter", password="pw")
+        self.topic = Topic.objects.create(text="Logging, tips", owner=self.user)
+        Entry.objects.create(topic=self.topic, text='Say "hello"\nto logs')
+        Topic.objects.create(text="Empty", owner=self.user)
+        other = User.objects.create_user(username="other", password="pw")
+        Topic.objects.create(text="Not mine", owner=other)
+        self.client.force_login(self.user)
+
+    def download(self, fmt: str) -> bytes:
+        response = self.client.get(reverse("notes:export", args=[fmt]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_jsonl(self) -> None:
+        lines = self.download("jsonl").decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([r["type"] for r in records], ["topic", "topic", "entry"])
+        self.assertEqual(records[2]["text"], 'Say "hello"\nto logs')
+        self.assertEqual(records[2]["topic"], self.topic.id)
+
+    def test_csv(self) -> None:
+        rows = list(csv.DictReader(io.StringIO(self.download("csv").decode())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["text"], "Logging, tips")
+
+    def test_markdown_zip(self) -> None:
+        with zipfile.ZipFile(io.BytesIO(self.download("md"))) as archive:
+            names = sorted(archive.namelist())
+            self.assertEqual(len(names), 2)
+            self.assertTrue(names[0].endswith("-logging-tips.md"))
+            content = archive.read(names[0]).decode()
+        self.assertTrue(content.startswith("# Logging, tips"))
+        self.assertIn('Say "hello"', content)
+
+    def test_unknown_format(self) -> None:
+        response = self.client.get(reverse("notes:export", args=["xml"]))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(ASYNC_VIEWS=True)
+    async def test_streamed_under_asgi(self) -> None:
+        pulled = []
+
+        def chunks(_user_id: int, _fmt: str) -> Any:
+            for number in range(3 * export.ASYNC_BATCH):
+                pulled.append(number)
+                yield f"chunk {number}\n"
+
+        await self.async_client.aforce_login(self.user)
+        with mock.patch("notes.export.export_stream", chunks):
+            response = await self.async_client.get(
+                reverse("notes:export", args=["jsonl"])
+            )
+            self.assertTrue(response.is_async)
+            stream = aiter(response.streaming_content)
+            self.assertEqual(await anext(stream), b"chunk 0\n")
+            # not read to the end before the first chunk goes out
+            self.assertEqual(len(pulled), export.ASYNC_BATCH)
+            rest = [chunk async for chunk in stream]
+        self.assertEqual(len(rest), 3 * export.ASYNC_BATCH - 1)
+
+
+class ImportTest(TestCase):
+    def setUp(self) -> None:
+        self.source = User.objects.create_user(username="source", password="pw")
+        topic = Topic.objects.create(text="Logging, tips", owner=self.source)
+        Entry.objects.create(topic=topic, text='Say "hello"\nto logs')
+        Entry.objects.create(topic=topic, text="Second")
+        Topic.objects.create(text="Empty", owner=self.source)
+        self.user = User.objects.create_user(username="importer", password="pw")
+        self.client.force_login(self.source)
+
+    def export(self, fmt: str) -> bytes:
+        response = self.client.get(reverse("notes:export", args=[fmt]))
+        return b"".join(response.streaming_content)
+
+    def test_round_trip(self) -> None:
+        for fmt in ("jsonl", "csv", "md"):
+            with self.subTest(fmt=fmt):
+                Topic.objects.filter(owner=self.user).delete()
+                result = import_notes(self.user.id, io.BytesIO(self.export(fmt)), fmt)
+                self.assertEqual((result.topics, result.entries), (2, 2))
+                self.assertEqual(result.skipped, 0)
+                imported = Topic.objects.get(owner=self.user, text="Logging, tips")
+                self.assertEqual(
+                    list(imported.entry_set.order_by("id").values_list("text")),
+                    [('Say "hello"\nto logs',), ("Second",)],
+                )
+
+    def test_markdown_headings_in_entries(self) -> None:
+        topic = Topic.objects.create(text="Headings", owner=self.source)
+        text = "Intro\n## not an entry\n# nor a topic\n\\## escaped\n### h3"
+        Entry.objects.create(topic=topic, text=text)
+        Entry.objects.create(topic=topic, text="# first line")
+        result = import_notes(self.user.id, io.BytesIO(self.export("md")), "md")
+        self.assertEqual(result.entries, 4)
+        imported = Topic.objects.get(owner=self.user, text="Headings")
+        self.assertEqual(
+            list(imported.entry_set.order_by("id").values_list("text", flat=True)),
+            [text, "# first line"],
+        )
+
+    def test_invalid_rows_are_skipped(self) -> None:
+        lines = [
+            {"type": "topic", "id": 1, "text": "x" * 201},
+            {"type": "topic", "id": 2, "text": "Ok"},
+            {"type": "entry", "topic": 1, "text": "orphan"},
+            {"type": "entry", "topic": 2, "text": ""},
+            {"type": "entry", "topic": 2, "text": "kept"},
+        ]
+        data = "\n".join(json.dumps(line) for line in lines).encode() + b"\nnot json"
+        result = import_notes(self.user.id, io.BytesIO(data), "jsonl", batch_size=1)
+        self.assertEqual((result.topics, result.entries, result.skipped), (1, 1, 4))
+        self.assertTrue(result.errors[0].startswith("row 1:"))
+        self.assertEqual(Entry.objects.get(topic__owner=self.user).text, "kept")
+
+    def test_import_page(self) -> None:
+        upload = SimpleUploadedFile("notes.csv", self.export("csv"))
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("notes:import"), {"file": upload})
+        self.assertContains(response, "Imported 2 topics and 2")
+        self.assertEqual(Topic.objects.filter(owner=self.user).count(), 2)
+
+    def test_api(self) -> None:
+        token = RefreshToken.for_user(self.user).access_token
+        upload = SimpleUploadedFile("notes.data", self.export("jsonl"))
+        response = self.client.post(
+            reverse("notes:api-import"),
+            {"file": upload, "format": "jsonl"},
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["entries"], 2)
+        self.assertEqual(Entry.objects.filter(topic__owner=self.user).count(), 2)
@@ -0,0 +1,182 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..models import Entry, Topic
+
+
+@override_settings(AUTH_USER_CACHE=False)
+class OwnerScopedQueryTest(TestCase):
+    """Each view resolves the object and its ownership in a single query"""
+
+    # Every authenticated request loads the session and (uncached) the user
+    AUTH_QUERIES = 2
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username="owner", password="pw")
+        self.topic = Topic.objects.create(text="Mine", owner=self.user)
+        self.entry = Entry.objects.create(topic=self.topic, text="note")
+        self.client.force_login(self.user)
+
+    def assertViewQueries(self, view_queries: int, url: str) -> None:
+        with self.assertNumQueries(self.AUTH_QUERIES + view_queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_topic(self) -> None:
+        # the ETag aggregate, the topic, then one page of entries
+        self.assertViewQueries(3, reverse("notes:topic", args=[self.topic.id]))
+
+    def test_topic_forms(self) -> None:
+        for name in ("new_entry", "edit_topic", "delete_topic"):
+            self.assertViewQueries(1, reverse(f"notes:{name}", args=[self.topic.id]))
+
+    def test_entry_forms(self) -> None:
+        for name in ("edit_entry", "delete_entry"):
+            self.assertViewQueries(1, reverse(f"notes:{name}", args=[self.entry.id]))
+
+    def test_other_users_objects_404(self) -> None:
+        intruder = User.objects.create_user(username="intruder", password="pw")
+        self.client.force_login(intruder)
+        for name, pk in (
+            ("topic", self.topic.id),
+            ("new_entry", self.topic.id),
+            ("edit_topic", self.topic.id),
+            ("delete_topic", self.topic.id),
+            ("edit_entry", self.entry.id),
+            ("delete_entry", self.entry.id),
+        ):
+            response = self.client.get(reverse(f"notes:{name}", args=[pk]))
+            self.assertEqual(response.status_code, 404, name)
+        response = self.client.post(
+            reverse("notes:new_entry", args=[self.topic.id]), {"text": "sneaky"}
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Entry.objects.filter(text="sneaky").exists())
+
+
+class EntryHtmlTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username="html", password="pw")
+        self.topic = Topic.objects.create(text="Markup", owner=self.user)
+
+    def test_rendered_on_save_and_bulk_writes(self) -> None:
+        entry = Entry.objects.create(topic=self.topic, text="one\n\n<b>two</b>")
+        self.assertEqual(entry.text_html, "<p>one</p>\n\n<p>&lt;b&gt;two&lt;/b&gt;</p>")
+
+        (bulk,) = Entry.objects.bulk_create([Entry(topic=self.topic, text="a\nb")])
+        bulk.refresh_from_db()
+        self.assertEqual(bulk.text_html, "<p>a<br>b</p>")
+
+        bulk.text = "changed"
+        Entry.objects.bulk_update([bulk], ["text"])
+        bulk.refresh_from_db()
+        self.assertEqual(bulk.text_html, "<p>changed</p>")
+
+    def test_backfill_command(self) -> None:
+        entry = Entry.objects.create(topic=self.topic, text="<script>x</script>")
+        Entry.objects.filter(id=entry.id).update(text_html="")
+        call_command("render_entries", stdout=StringIO(), stderr=StringIO())
+        entry.refresh_from_db()
+        self.assertEqual(entry.text_html, "<p>&lt;script&gt;x&lt;/script&gt;</p>")
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("notes:topic", args=[self.topic.id]))
+        self.assertContains(response, entry.text_html, html=False)
+        self.assertNotContains(response, "<script>x")
+
+
+class TopicCountersTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username="counts", password="pw")
+        self.quiet = Topic.objects.create(text="Quiet", owner=self.user)
+        self.busy = Topic.objects.create(text="Busy", owner=self.user)
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.bulk_url = reverse("notes:api-entries-bulk")
+
+    def counters(self, topic: Topic) -> tuple:
+        topic.refresh_from_db()
+        return topic.entry_count, topic.last_entry_at
+
+    def test_save_and_delete(self) -> None:
+        first = Entry.objects.create(topic=self.busy, text="one")
+        second = Entry.objects.create(topic=self.busy, text="two")
+        self.assertEqual(self.counters(self.busy), (2, second.date_added))
+
+        second.delete()
+        self.assertEqual(self.counters(self.busy), (1, first.date_added))
+
+        # moving an entry counts it out of one topic and into the other
+        first.topic = self.quiet
+        first.save()
+        self.assertEqual(self.counters(self.busy), (0, None))
+        self.assertEqual(self.counters(self.quiet), (1, first.date_added))
+
+    def test_queryset_delete_through_admin_action(self) -> None:
+        kept = Entry.objects.create(topic=self.busy, text="kept")
+        doomed = [Entry.objects.create(topic=self.busy, text=f"x{i}") for i in range(3)]
+        admin_user = User.objects.create_superuser(username="ops", password="pw")
+        self.client.force_login(admin_user)
+        response = self.client.post(
+            reverse("admin:notes_entry_changelist"),
+            {
+                "action": "delete_selected",
+                "_selected_action": [entry.id for entry in doomed],
+                "post": "yes",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Entry.objects.filter(topic=self.busy).count(), 1)
+        self.assertEqual(self.counters(self.busy), (1, kept.date_added))
+
+    def test_bulk_api(self) -> None:
+        payload = [{"topic": self.busy.id, "text": f"note {i}"} for i in range(5)]
+        response = self.client.post(
+            self.bulk_url, payload, content_type="application/json", **self.auth
+        )
+        ids = [row["id"] for row in response.json()]
+        self.assertEqual(self.counters(self.busy)[0], 5)
+
+        moves = [{"id": pk, "topic": self.quiet.id} for pk in ids[:2]]
+        self.client.patch(
+            self.bulk_url, moves, content_type="application/json", **self.auth
+        )
+        self.assertEqual(self.counters(self.busy)[0], 3)
+        self.assertEqual(self.counters(self.quiet)[0], 2)
+
+        self.client.delete(
+            self.bulk_url, {"ids": ids}, content_type="application/json", **self.auth
+        )
+        self.assertEqual(self.counters(self.busy), (0, None))
+        self.assertEqual(self.counters(self.quiet), (0, None))
+
+    def test_reconcile_command(self) -> None:
+        entry = Entry.objects.create(topic=self.busy, text="one")
+        Topic.objects.filter(id=self.busy.id).update(entry_count=7, last_entry_at=None)
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("fixed 1", out.getvalue())
+        self.assertEqual(self.counters(self.busy), (1, entry.date_added))
+
+    def test_topics_page_sorted_by_activity(self) -> None:
+        Entry.objects.create(topic=self.busy, text="one")
+        self.client.force_login(self.user)
+        url = reverse("notes:topics")
+        # the counters come with the topic rows: no query per topic
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {"sort": "activity"})
+        self.assertEqual(
+            [topic["text"] for topic in response.context["topics"]], ["Busy", "Quiet"]
+        )
+        self.assertEqual(response.context["topics"][0]["entry_count"], 1)
+        response = self.client.get(url)
+        self.assertEqual(
+            [topic["text"] for topic in response.context["topics"]], ["Quiet", "Busy"]
+        )
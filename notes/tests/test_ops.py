@@ -0,0 +1,108 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from config import health
+from config.health import readiness
+from config.metrics import registry
+
+
+class HealthCheckTest(TestCase):
+    def test_healthz_route(self) -> None:
+        # If you have named your URL pattern, use reverse('healthz')
+        # Otherwise, you can just hardcode the path like '/healthz/'
+        response = self.client.get("/healthz/")
+        self.assertEqual(response.status_code, 200)
+        # Optionally, check response content if you return any specific data
+        self.assertJSONEqual(response.content, {"status": "ok"})
+
+
+class ReadinessTest(TestCase):
+    def setUp(self) -> None:
+        readiness.reset()
+
+    def test_liveness_with_or_without_slash(self) -> None:
+        for url in ("/healthz/live/", "/healthz/live"):
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_ready_reports_each_check(self) -> None:
+        response = self.client.get("/healthz/ready/")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["status"], "ok")
+        self.assertEqual(set(body["checks"]), {"database", "migrations", "cache"})
+        self.assertTrue(all(check["ok"] for check in body["checks"].values()))
+
+    def test_result_is_memoized(self) -> None:
+        self.client.get("/healthz/ready")
+        with self.assertNumQueries(0):
+            response = self.client.get("/healthz/ready")
+        self.assertEqual(response.status_code, 200)
+
+    def test_failing_check_is_503(self) -> None:
+        def broken() -> None:
+            raise OSError("connection refused")
+
+        with mock.patch.dict(health.CHECKS, {"cache": broken}):
+            response = self.client.get("/healthz/ready/")
+        self.assertEqual(response.status_code, 503)
+        body = response.json()
+        self.assertEqual(body["status"], "fail")
+        self.assertFalse(body["checks"]["cache"]["ok"])
+        self.assertIn("connection refused", body["checks"]["cache"]["error"])
+        self.assertTrue(body["checks"]["database"]["ok"])
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsTest(TestCase):
+    def setUp(self) -> None:
+        registry.reset()
+        self.user = User.objects.create_user(username="staff", password="pw")
+        self.client.force_login(self.user)
+
+    def test_server_timing_and_prometheus_output(self) -> None:
+        response = self.client.get(reverse("notes:topics"))
+        self.assertRegex(response["Server-Timing"], r'db;dur=[\d.]+;desc="\d+ queries"')
+
+        self.user.is_staff = True
+        self.user.save()
+        body = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn(
+            'http_request_duration_seconds_count{view="notes:topics",method="GET"} 1',
+            body,
+        )
+        self.assertIn('http_request_db_queries_total{view="notes:topics"', body)
+        # connection acquisition (only counted by the PostgreSQL backend)
+        self.assertIn("db_connection_acquire_seconds_count", body)
+
+    def test_metrics_hidden_from_non_staff(self) -> None:
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled_adds_no_header(self) -> None:
+        response = self.client.get(reverse("notes:index"))
+        self.assertNotIn("Server-Timing", response)
+
+
+class StartupTest(TestCase):
+    def test_migrate_skipped_when_current(self) -> None:
+        out = StringIO()
+        call_command("migrate_if_needed", stdout=out)
+        self.assertIn("No migrations to apply", out.getvalue())
+
+    def test_startup_profile(self) -> None:
+        out = StringIO()
+        call_command("startup_profile", top=5, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(
+            list(report["phases_ms"]),
+            ["django", "settings", "apps", "wsgi_handler", "urlconf"],
+        )
+        self.assertIn("notes", report["apps_ms"])
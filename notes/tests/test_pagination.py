@@ -0,0 +1,46 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Entry, Topic
+from ..pagination import PAGE_SIZE
+
+
+class TopicPaginationTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username="reader", password="pw")
+        self.topic = Topic.objects.create(text="Long topic", owner=self.user)
+        for i in range(PAGE_SIZE + 5):
+            Entry.objects.create(topic=self.topic, text=f"entry {i}")
+        self.client.force_login(self.user)
+        self.url = reverse("notes:topic", args=[self.topic.id])
+
+    def test_first_page_is_newest_entries(self) -> None:
+        response = self.client.get(self.url)
+        page = response.context["page"]
+        self.assertEqual(len(page.entries), PAGE_SIZE)
+        self.assertEqual(page.entries[0].text, f"entry {PAGE_SIZE + 4}")
+        self.assertTrue(page.has_older)
+        self.assertFalse(page.has_newer)
+
+    def test_older_then_newer_round_trip(self) -> None:
+        first = self.client.get(self.url).context["page"]
+        older = self.client.get(self.url, {"before": first.older_cursor})
+        older_page = older.context["page"]
+        self.assertEqual(
+            [e.text for e in older_page.entries],
+            [f"entry {i}" for i in range(4, -1, -1)],
+        )
+        self.assertFalse(older_page.has_older)
+        self.assertTrue(older_page.has_newer)
+
+        newer = self.client.get(self.url, {"after": older_page.newer_cursor})
+        self.assertEqual(
+            [e.id for e in newer.context["page"].entries],
+            [e.id for e in first.entries],
+        )
+
+    def test_bad_cursor_shows_first_page(self) -> None:
+        response = self.client.get(self.url, {"before": "not-a-cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["page"].entries), PAGE_SIZE)
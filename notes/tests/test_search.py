@@ -0,0 +1,44 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Entry, Topic
+from ..search import search
+
+
+class SearchTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username="finder", password="pw")
+        self.topic = Topic.objects.create(text="Python logging", owner=self.user)
+        self.match = Entry.objects.create(
+            topic=self.topic, text="Use the logging module instead of <print>"
+        )
+        Entry.objects.create(topic=self.topic, text="Virtual environments")
+        other = User.objects.create_user(username="snoop", password="pw")
+        other_topic = Topic.objects.create(text="Secret logging", owner=other)
+        Entry.objects.create(topic=other_topic, text="logging secrets")
+
+    def test_ranked_scoped_highlighted(self) -> None:
+        results = search(self.user.id, "logging")
+        self.assertEqual([hit.id for hit in results.topics], [self.topic.id])
+        self.assertEqual([hit.id for hit in results.entries], [self.match.id])
+        snippet = results.entries[0].snippet
+        self.assertIn("<mark>logging</mark>", snippet)
+        self.assertIn("&lt;print&gt;", snippet)
+
+    def test_bulk_inserts_and_updates_are_indexed(self) -> None:
+        Entry.objects.bulk_create([Entry(topic=self.topic, text="bulk gazebo")])
+        self.assertEqual(len(search(self.user.id, "gazebo").entries), 1)
+        Entry.objects.filter(text="bulk gazebo").update(text="bulk pergola")
+        self.assertEqual(search(self.user.id, "gazebo").entries, [])
+        self.assertEqual(len(search(self.user.id, "pergola").entries), 1)
+
+    def test_query_syntax_is_not_interpreted(self) -> None:
+        results = search(self.user.id, 'logging" OR NEAR(')
+        self.assertEqual(len(results.entries), 0)
+
+    def test_search_view(self) -> None:
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("notes:search"), {"q": "logging"})
+        self.assertContains(response, "<mark>logging</mark>")
+        self.assertNotContains(response, "secrets")
@@ -2,8 +2,14 @@
 URL configuration for the main app (home page).
 """
 
+from django.conf import settings
 from django.urls import path
 from . import views  # import ./views.py
+from . import api  # REST API views (./api.py)
+from . import async_views  # async read views for ASGI (./async_views.py)
+
+# The read-only pages come from async_views.py when serving with ASGI
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 # Unique name helps Django to identify this specific urls.py
 app_name = "notes"
@@ -12,15 +18,19 @@ app_name = "notes"
 urlpatterns = [
     # Home page
     # Add "" to the route to match the default (root) path "/"
-    # views.index: the function (route) Django will call in views.py when it
-    #   matches this route
+    # read_views.index: the function (route) Django will call in views.py (or
+    #   async_views.py) when it matches this route
     # name="index": a name/alias for this route (useful for reverse lookups)
-    path("", views.index, name="index"),
+    path("", read_views.index, name="index"),
     # Any additional pages available for this app...
     # Show Topics list
-    path("topics/", views.topics, name="topics"),
+    path("topics/", read_views.topics, name="topics"),
     # Show Topic details by its id (e.g. http://<app_name>/topics/1/)
-    path("topics/<int:topic_id>/", views.topic, name="topic"),
+    path("topics/<int:topic_id>/", read_views.topic, name="topic"),
+    # Search topics and entries (e.g. http://<app_name>/search/?q=logging)
+    path("search/", views.search, name="search"),
+    # Download all notes: /export/jsonl/, /export/csv/ or /export/md/ (zip)
+    path("export/<str:fmt>/", views.export, name="export"),
     ##
     # Create routes
     #
@@ -28,6 +38,8 @@ urlpatterns = [
     path("new_topic/", views.new_topic, name="new_topic"),
     # Create a new topic entry
     path("new_entry/<int:topic_id>/", views.new_entry, name="new_entry"),
+    # Add the notes of an exported file (jsonl, csv or md zip)
+    path("import/", views.import_notes, name="import"),
     ##
     # Update routes
     #
@@ -42,4 +54,21 @@ urlpatterns = [
     path("delete_topic/<int:topic_id>/", views.delete_topic, name="delete_topic"),
     # Delete an entry (GET shows confirm page, POST performs delete)
     path("delete_entry/<int:entry_id>/", views.delete_entry, name="delete_entry"),
+    ##
+    # REST API routes (JWT authenticated)
+    #
+    path("api/topics/", api.TopicList.as_view(), name="api-topics"),
+    path("api/topics/<int:pk>/", api.TopicDetail.as_view(), name="api-topic"),
+    path("api/entries/", api.EntryList.as_view(), name="api-entries"),
+    # Bulk create (POST), update (PATCH) and delete (DELETE) of entries
+    path("api/entries/bulk/", api.EntryBulk.as_view(), name="api-entries-bulk"),
+    path("api/entries/<int:pk>/", api.EntryDetail.as_view(), name="api-entry"),
+    # Changes since a cursor for offline clients (?since=<cursor>)
+    path("api/sync/", api.Sync.as_view(), name="api-sync"),
+    # Full-text search (?q=<terms>)
+    path("api/search/", api.Search.as_view(), name="api-search"),
+    # Streamed export: jsonl, csv or md (a zip of Markdown files)
+    path("api/export/<str:fmt>/", api.Export.as_view(), name="api-export"),
+    # Import an exported file (multipart 'file', optional 'format')
+    path("api/import/", api.Import.as_view(), name="api-import"),
 ]
@@ -2,9 +2,17 @@
 # Import redirect to forward from new_topic to the topic page on submit
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import Http404, HttpRequest, HttpResponse
+from django.http import Http404, HttpRequest, HttpResponse, StreamingHttpResponse
 from .models import Topic, Entry
 from .forms import TopicForm, EntryForm  # Import the new submission form
+from .forms import ImportForm
+from .cache import get_user_topics, topics_sort
+from .conditional import conditional, topic_validators, topics_validators
+from .deletion import delete_topic as delete_topic_and_entries
+from .export import FORMATS as EXPORT_FORMATS, export_response
+from .importer import detect_format, import_notes as import_file
+from .pagination import page_cursors, paginate_entries
+from .search import search as search_notes
 
 
 ##
@@ -18,33 +26,55 @@ def index(request: HttpRequest) -> HttpResponse:
 
 # Decorator restricts access to authenticated users, by running
 @login_required
+# 304 Not Modified when the browser's copy is current (see conditional.py)
+@conditional(topics_validators)
 def topics(request: HttpRequest) -> HttpResponse:
     """Topics page"""
-    # Query the database for the Topics, sort by date
-    # Retrieve only the objects from the database where the owner attribute
-    #   matches the current user.
-    topics = Topic.objects.filter(owner=request.user).order_by("date_added")
+    # The current user's Topics with their entry counters, oldest first or
+    #   (?sort=activity) most recently used first
+    # Served from the per-user cache, which is refreshed whenever one of
+    #   the user's topics or entries changes (see cache.py)
+    sort = topics_sort(request.GET.get("sort"))
+    topics = get_user_topics(request.user.id, sort)
     # define the context (here a dictionary)
-    context = {"topics": topics}
+    context = {"topics": topics, "sort": sort}
     return render(request, "notes/topics.html", context)
 
 
 @login_required
+@conditional(topic_validators)
 def topic(request: HttpRequest, topic_id: int) -> HttpResponse:
     """Show single topic list the entries"""
-    # query the database for the Topics, sort by date
-    topic = Topic.objects.get(id=topic_id)
-    # Check whether the currnt user has access
-    if topic.owner != request.user:
-        raise Http404
-    # desc order (newest first)
-    entries = topic.entry_set.order_by("-date_added")
+    # query the database for the Topic; only the owner may see it (404
+    #   otherwise), checked in the same query
+    topic = get_object_or_404(Topic.objects.for_user(request.user), id=topic_id)
+    # desc order (newest first), one page at a time using the
+    #   ?before=<cursor> (older) and ?after=<cursor> (newer) links
+    page = paginate_entries(topic.entry_set.all(), *page_cursors(request.GET))
     # store query results in a dictionary
-    context = {"topic": topic, "entries": entries}
+    context = {"topic": topic, "entries": page.entries, "page": page}
     # fill the template with context data
     return render(request, "notes/topic.html", context)
 
 
+@login_required
+def search(request: HttpRequest) -> HttpResponse:
+    """Full-text search of the user's topics and entries"""
+    query = request.GET.get("q", "").strip()
+    # ranked hits with highlighted snippets (empty until there is a query)
+    results = search_notes(request.user.id, query) if query else None
+    context = {"query": query, "results": results}
+    return render(request, "notes/search.html", context)
+
+
+@login_required
+def export(request: HttpRequest, fmt: str) -> StreamingHttpResponse:
+    """Download all of the user's notes (streamed, see export.py)"""
+    if fmt not in EXPORT_FORMATS:
+        raise Http404
+    return export_response(request.user.id, fmt)
+
+
 ##
 # Create using POST endpoints
 #
@@ -81,8 +111,8 @@ def new_topic(request: HttpRequest) -> HttpResponse:
 @login_required
 def new_entry(request: HttpRequest, topic_id: int) -> HttpResponse:
     """Create a new Entry for a Topic"""
-    # pass the topic's id number
-    topic = Topic.objects.get(id=topic_id)
+    # pass the topic's id number, only the owner may add entries
+    topic = get_object_or_404(Topic.objects.for_user(request.user), id=topic_id)
 
     if request.method != "POST":
         # Load a blank form (no arguments)
@@ -112,17 +142,35 @@ def new_entry(request: HttpRequest, topic_id: int) -> HttpResponse:
     return render(request, "notes/new_entry.html", context)
 
 
+@login_required
+def import_notes(request: HttpRequest) -> HttpResponse:
+    """Upload a jsonl, csv or md (zip) export and add its notes"""
+    result = None
+    if request.method != "POST":
+        form = ImportForm()
+    else:
+        # request.FILES holds the upload (spooled to disk when it is large)
+        form = ImportForm(data=request.POST, files=request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            fmt = form.cleaned_data["format"] or detect_format(upload.name)
+            if fmt is None:
+                form.add_error("format", "Choose the format of this file.")
+            else:
+                # parsed and inserted in batches (see importer.py)
+                result = import_file(request.user.id, upload, fmt)
+    context = {"form": form, "result": result}
+    return render(request, "notes/import.html", context)
+
+
 ##
 # Update endpoints
 #
 @login_required
 def edit_topic(request: HttpRequest, topic_id: int) -> HttpResponse:
     """Edit an existing Topic."""
-    topic = get_object_or_404(Topic, id=topic_id)
-
     # Ensure the current user owns the topic
-    if topic.owner != request.user:
-        raise Http404
+    topic = get_object_or_404(Topic.objects.for_user(request.user), id=topic_id)
 
     if request.method != "POST":
         # Load form pre-filled with topic data
@@ -141,11 +189,10 @@ def edit_topic(request: HttpRequest, topic_id: int) -> HttpResponse:
 @login_required
 def edit_entry(request: HttpRequest, entry_id: int) -> HttpResponse:
     """Edit an existing Entry"""
-    entry = Entry.objects.get(id=entry_id)
+    # Check whether the current user has access (the topic comes along in
+    #   the same query)
+    entry = get_object_or_404(Entry.objects.for_user(request.user), id=entry_id)
     topic = entry.topic
-    # Check whether the current user has access
-    if topic.owner != request.user:
-        raise Http404
 
     if request.method != "POST":
         # Load a blank form (no arguments)
@@ -175,13 +222,11 @@ def edit_entry(request: HttpRequest, entry_id: int) -> HttpResponse:
 @login_required
 def delete_topic(request: HttpRequest, topic_id: int) -> HttpResponse:
     """Delete an existing Topic and its entries."""
-    topic = get_object_or_404(Topic, id=topic_id)
-
-    if topic.owner != request.user:
-        raise Http404
+    topic = get_object_or_404(Topic.objects.for_user(request.user), id=topic_id)
 
     if request.method == "POST":
-        topic.delete()
+        # Deleted, or trashed and its entries purged later (see deletion.py)
+        delete_topic_and_entries(topic)
         return redirect("notes:topics")
 
     return render(request, "notes/delete_topic.html", {"topic": topic})
@@ -191,16 +236,13 @@ def delete_topic(request: HttpRequest, topic_id: int) -> HttpResponse:
 @login_required
 def delete_entry(request: HttpRequest, entry_id: int) -> HttpResponse:
     """Delete an existing entry."""
-    # Return the entry or show the 404 page
-    entry = get_object_or_404(Entry, id=entry_id)
+    # Return the user's entry (with its topic) or show the 404 page
+    entry = get_object_or_404(Entry.objects.for_user(request.user), id=entry_id)
     topic = entry.topic
 
-    # Check whether the current user has access
-    if topic.owner != request.user:
-        raise Http404
-
     # Using a form to delete the entry, so use the POST command
     if request.method == "POST":
+        # Leaves a marker for sync clients (see signals.py)
         entry.delete()
         return redirect("notes:topic", topic_id=topic.id)
 